@@ -1,67 +1,204 @@
+import argparse
+import logging
+import os
+import struct
 import sys
-from random import randint
-from time import sleep
 
 import pygame
 
-from game.bullet import Bullet
-from game.alien import Alien
+from game import assets
+from game.bullet import BulletPool
+from game.fleet import Fleet
+from game.particles import ParticleSystem
+from game.layout import fleet_layout, pitch
 from game.settings import Settings
 from game.ship import Ship
 from game.star import Star
 from utils.button import Button
+from utils.game_loop import GameLoop
+from utils.game_state import GameState
 from utils.game_stats import GameStats
+from utils.latency import LatencyTracker
+from utils.profiler import FrameProfiler, PerformanceOverlay, StartupTimer
+from utils.quality import QualityGovernor
+from utils.render_thread import DrawList, ThreadedRenderer
+from utils.renderer import DirtyRenderer, Renderer
+from utils.replay import InputPlayer, InputRecorder, LiveInput
 from utils.scoreboard import ScoreBoard
+from utils.snapshot import RewindBuffer, restore_snapshot, take_snapshot
+
+
+log = logging.getLogger(__name__)
 
 
 class AlienInvasion:
     """ Overall class to manage game assets and behavior """
 
-    def __init__(self):
+    def __init__(self, settings=None):
         """ Initialize the game and creates game resources"""
-        pygame.init()
+        self.startup = StartupTimer()
 
-        self.settings = Settings()
+        # Only the pygame modules the game uses are initialized
+        with self.startup.phase('pygame init'):
+            pygame.display.init()
+            pygame.font.init()
 
-        # for windowed mode
-        # self.screen = pygame.display.set_mode((self.settings.screen_width, self.settings.screen_height))
+        self.settings = settings or Settings()
+        self.profiler = FrameProfiler(self.settings)
+        # Lowers optional detail when frames take too long
+        self.governor = QualityGovernor(self.settings, self._apply_quality)
 
-        # for the fullscreen mode
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        self.settings.screen_width = self.screen.get_rect().width
-        self.settings.screen_height = self.screen.get_rect().height
+        with self.startup.phase('display'):
+            self.screen, self.display = self._create_display()
+            # With a render thread the game draws into a list of commands
+            # for it instead of onto the screen itself
+            if self.settings.threaded_rendering:
+                self.screen = DrawList(self.screen)
+            self.settings.screen_width = self.screen.get_rect().width
+            self.settings.screen_height = self.screen.get_rect().height
 
-        pygame.display.set_caption("Alien Invasion")
+            pygame.display.set_caption("Alien Invasion")
 
         # Create an instance to store game statistics and create a scoreboard
-        self.stats = GameStats(self)
-        self.sb = ScoreBoard(self)
-
-        self.ship = Ship(self)
-        self.bullets = pygame.sprite.Group()
-        self.stars = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
-
-        self._populate_sky()
-        self._create_fleet()
-
-        self.play_button = Button(self, 'Play')
+        with self.startup.phase('scoreboard'):
+            self.stats = GameStats(self)
+            self.state = GameState()
+            self.sb = ScoreBoard(self)
+            self.play_button = Button(self, 'Play')
+            self.overlay = PerformanceOverlay(self, self.profiler)
+
+        with self.startup.phase('sprites'):
+            self.ship = Ship(self)
+            self.bullets = BulletPool(self)
+            self.stars = pygame.sprite.Group()
+            self.fleet = Fleet(self)
+            # The main fleet comes first, stress mode adds more
+            self.fleets = [self.fleet]
+            self.particles = ParticleSystem(self)
+            self.create_fleet()
+
+        # Stars never move, so they are baked into the background once.
+        # The first frame shows the empty sky, the stars follow right after it
+        renderer_class = DirtyRenderer if self.settings.dirty_rendering else Renderer
+        if self.settings.threaded_rendering:
+            renderer = renderer_class(self.screen.screen, self._bake_background(), self.display)
+            self.renderer = ThreadedRenderer(renderer, self.screen)
+        else:
+            self.renderer = renderer_class(self.screen, self._bake_background(), self.display)
+
+        self.loop = GameLoop(self.settings)
+        self.latency = LatencyTracker(self.settings)
+        if self.latency.enabled:
+            self.renderer.on_present = self.latency.presented
+        # Where input events come from: the event queue, or a log to replay
+        self.input = LiveInput()
+
+        # Snapshots of the game for quick-save and rewinding
+        self.quicksave = None
+        self.rewind = RewindBuffer(self.settings)
+
+        # Work that can wait until the first frame is on the screen
+        self._deferred = [
+            ('sky', self._populate_sky),
+        ]
+        self.startup.mark('ready')
+
+    def _create_display(self):
+        """ Open the display and return the surface to draw on and the display
+
+        The display is None when the game draws on it directly. With a
+        render size set the game is drawn at that size and scaled to the
+        display, by SDL if possible and otherwise from an offscreen surface.
+        """
+        settings = self.settings
+        flags = pygame.FULLSCREEN if settings.fullscreen else 0
+        size = (0, 0) if settings.fullscreen else (settings.screen_width, settings.screen_height)
+        if not settings.render_size:
+            return pygame.display.set_mode(size, flags), None
+
+        if settings.hardware_scaling and hasattr(pygame, 'SCALED'):
+            try:
+                return pygame.display.set_mode(settings.render_size, flags | pygame.SCALED), None
+            except pygame.error:
+                pass
+        display = pygame.display.set_mode(size, flags)
+        return pygame.Surface(settings.render_size).convert(), display
 
     def run_game(self):
         """ Start the main loop for the game """
-        while True:
+        try:
+            while not self.input.finished:
+                self._run_frame()
+        finally:
+            self.input.close()
+            self.renderer.close()
+            self.sb.leaderboard.close()
+
+    def _run_frame(self):
+        """ Handle input, advance the simulation and draw one frame """
+        profiler = self.profiler
+        with profiler.section('events'):
             self._check_events()
 
+        # The simulation advances in fixed ticks, independent of the frame rate
+        # Pauses are timed in ticks as well, so frames keep coming during them
+        ticks = self.loop.ticks()
+        for _ in range(ticks):
+            self.loop.advance()
+            self.state.update(self.loop.dt)
+            if self.state.playing:
+                self._update_simulation(self.loop.dt)
+            # Explosions play out during pauses as well
+            with profiler.section('particles'):
+                self.particles.update(self.loop.dt)
+            # Snapshots are taken on fixed ticks, so a replay rewinds to the
+            # same state as the recorded session
             if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
+                self.rewind.update(self)
+        if ticks:
+            self.latency.simulated(self.loop.tick_count)
 
+        self.sb.update()
+        with profiler.section('draw'):
             self._update_screen()
+        with profiler.section('flip'):
+            # Frames are numbered the way the renderer counts them
+            self.latency.submitted()
+            self.renderer.end_frame()
+
+        self.loop.end_frame()
+        profiler.end_frame()
+        self.governor.update(self.loop.work_time)
+
+        if self._deferred:
+            self._run_deferred()
+
+    def _run_deferred(self):
+        """ Do the startup work that was put off until after the first frame """
+        self.startup.mark('first frame')
+        for name, task in self._deferred:
+            with self.startup.phase(name):
+                task()
+        self._deferred = []
+
+        if self.settings.report_startup:
+            print('\n'.join(self.startup.report()))
+
+    def _update_simulation(self, dt):
+        """ Advance the ship, bullets and aliens by one tick of dt seconds """
+        profiler = self.profiler
+        with profiler.section('ship'):
+            self.ship.update(dt)
+        with profiler.section('bullets'):
+            self._update_bullets(dt)
+        with profiler.section('aliens'):
+            self._update_aliens(dt)
 
     def _check_events(self):
         """ Respond to keypresses and mouse events """
-        for event in pygame.event.get():
+        events = self.input.get(self.loop.ticks_run)
+        self.latency.polled(events)
+        for event in events:
             if event.type == pygame.QUIT:
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
@@ -69,8 +206,7 @@ class AlienInvasion:
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
+                self._check_play_button(self.renderer.to_screen(event.pos))
 
     def _check_keydown_events(self, event):
         """ Respond to keypresses """
@@ -96,6 +232,62 @@ class AlienInvasion:
             self.sb.prep_level()
         elif event.key == pygame.K_r:
             self._end_game()
+        elif event.key == pygame.K_F3:
+            self.profiler.toggle()
+        elif event.key == pygame.K_F4:
+            self.profiler.dump(self.settings.profile_path)
+        elif event.key == pygame.K_F5:
+            self._quick_save()
+        elif event.key == pygame.K_F9:
+            self._quick_load()
+        elif event.key == pygame.K_BACKSPACE:
+            self._rewind()
+
+    def _quick_save(self):
+        """ Keep a snapshot of the game in memory and write it to the quick-save file """
+        try:
+            self.quicksave = take_snapshot(self)
+        except (struct.error, ValueError) as error:
+            log.warning('could not quick-save: %s', error)
+            return
+        path = self.settings.quicksave_path
+        if path:
+            try:
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(self.quicksave)
+                os.replace(path + '.tmp', path)
+            except OSError as error:
+                log.warning('could not write quick-save %s: %s', path, error)
+
+    def _quick_load(self):
+        """ Load the quick-save from memory, or from its file after a restart """
+        data = self.quicksave
+        path = self.settings.quicksave_path
+        if data is None and path:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return
+        # Snapshots taken after the quick-save would rewind into the future
+        if data is not None and self.load_snapshot(data):
+            self.rewind.clear()
+
+    def _rewind(self):
+        """ Go back to the newest snapshot of the rewind buffer """
+        data = self.rewind.pop()
+        if data is not None:
+            self.load_snapshot(data)
+
+    def load_snapshot(self, data):
+        """ Put the game into the state of a snapshot, ignoring ones that do not fit """
+        try:
+            restore_snapshot(self, data)
+        except (ValueError, struct.error) as error:
+            log.warning('could not load snapshot: %s', error)
+            return False
+        pygame.mouse.set_visible(not self.stats.game_active)
+        return True
 
     def _check_keyup_events(self, event):
         """ Respond to key releases """
@@ -113,102 +305,119 @@ class AlienInvasion:
     def _check_bullet_alien_collisions(self):
         """ Respond for bullet-alien collisions """
         # Remove any bullet and alien that have collided
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
-
-        if collisions:
-            for aliens in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens)
-
-            self.sb.prep_score()
+        # Each bullet only checks the aliens in the fleet columns under it
+        collided = False
+        for slot in self.bullets.slots():
+            rect = self.bullets.rect(slot)
+            for fleet in self.fleets:
+                hits = fleet.hits(rect, self.bullets.mask)
+                if hits:
+                    collided = True
+                    self.bullets.remove(slot)
+                    self.particles.emit(*fleet.centers(hits))
+                    fleet.remove(hits)
+                    self.stats.score += self.settings.alien_points * len(hits)
+                    break
+
+        if collided:
+            self.sb.score_changed()
             self.sb.check_high_score()
 
-        if not self.aliens:
-            self._start_new_level()
+        if not any(self.fleets):
+            # Show the empty sky for a moment before the next level
+            self.state.set(GameState.LEVEL_TRANSITION, self.settings.level_pause, self.start_new_level)
 
-    def _start_new_level(self):
+    def start_new_level(self):
         """ Level up the game if all alien ships were destroyed """
-        # Destroy existing bullets and create new fleet
+        # Destroy existing bullets and create new fleet, sized for the new
+        # level in stress mode
         self.bullets.empty()
-        self._create_fleet()
         self.settings.increase_speed()
+        self.create_fleet()
 
         # Increase level
         self.stats.level += 1
         self.sb.prep_level()
+        self.state.set(GameState.PLAYING)
 
-    def _check_fleet_edges(self):
+    def _check_fleet_edges(self, fleet):
         """ Respond appropriately if any aliens have reached the edge """
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if fleet.check_edges():
+            self._change_fleet_direction(fleet)
 
-    def _check_aliens_bottoms(self):
+    def _check_aliens_bottoms(self, fleet):
         """ Check if any aliens have reached the bottom of the screen """
-        screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= screen_rect.bottom:
-                # Treat it the same as if the ship got hit
-                self._ship_hit()
-                break
+        if fleet.check_bottom():
+            # Treat it the same as if the ship got hit
+            self._ship_hit()
+            return True
+        return False
 
-    def _change_fleet_direction(self):
+    def _change_fleet_direction(self, fleet):
         """ Drop the entire fleet and change the fleet's direction """
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
-        self.settings.fleet_direction *= -1
-
-    def _create_alien(self, alien_number, row_number):
-        """ Create an alien and place it in the row """
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        # Double indent from left side of the screen for every even row
-        # indent_width = alien_width if row_number % 2 == 0 else 2 * alien_width
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.rect.x = alien.x
-        alien.rect.y = alien_height + 2 * alien_height * row_number
-        self.aliens.add(alien)
-
-    def _create_fleet(self):
-        """ Create the fleet of aliens """
-        # Create and alien and finds a number of aliens in the row
-        # Spacing between each alien is equal to one alien width
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        ship_height = self.ship.rect.height
-        # Defying the number of alien to fill all available space in a row
-        available_space_in_row = self.settings.screen_width - 2 * alien_width
-        number_aliens_in_row = available_space_in_row // (2 * alien_width)
-        # Determine a number of rows of alien to fit the screen
-        available_space_for_rows = self.settings.screen_height - ship_height - (5 * alien_height)
-        number_of_rows = available_space_for_rows // (2 * alien_height)
-
-        # Creates the fleet of aliens
-        for row_number in range(number_of_rows):
-            for alien_number in range(number_aliens_in_row):
-                self._create_alien(alien_number, row_number)
+        fleet.drop()
+        fleet.direction *= -1
+
+    def create_fleet(self):
+        """ Create the fleet of aliens, and the extra fleets of stress mode """
+        settings = self.settings
+        with self.profiler.section('fleet'):
+            xs, ys = self.fleet_layout(settings.fleet_density, settings.extra_rows)
+            self.fleet.build(xs, ys)
+
+            # Extra fleets fly between the rows of the main fleet, every
+            # other one in the opposite direction
+            while len(self.fleets) < settings.fleet_count:
+                self.fleets.append(Fleet(self, direction=1))
+            del self.fleets[settings.fleet_count:]
+            row_pitch = pitch(assets.get_size('alien')[1], settings.fleet_density)
+            for number, fleet in enumerate(self.fleets[1:], 1):
+                shift = row_pitch * number // len(self.fleets)
+                fleet.build(xs, tuple(y + shift for y in ys))
+                fleet.direction = -settings.fleet_direction if number % 2 else settings.fleet_direction
+
+    def fleet_layout(self, density, extra_rows):
+        """ Return the alien positions of a fleet of the density and extra rows """
+        settings = self.settings
+        return fleet_layout(settings.screen_width, settings.screen_height, assets.get_size('alien'),
+                            self.ship.rect.height, density, extra_rows)
 
     def _end_game(self):
         """ Set end game conditions """
         self.stats.game_active = False
+        self.state.set(GameState.GAME_OVER)
         self.settings.manual_level = 1
         self.sb.store_high_score()
         pygame.mouse.set_visible(True)
 
     def _fire_bullet(self):
-        """ Create a new bullet and add it to the bullets group """
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
+        """ Fire a new bullet from the bullet pool """
+        self.bullets.fire()
 
     def _populate_sky(self):
         """ Place stars on the sky """
         for _ in range(self.settings.star_count):
             star = Star(self)
             star_width, star_height = star.rect.size
-            star.rect.x = randint(star_width, self.settings.screen_width - star_width)
-            star.rect.y = randint(star_height, self.settings.screen_height - star_height)
+            star.rect.x = self.settings.rng.randint(star_width, self.settings.screen_width - star_width)
+            star.rect.y = self.settings.rng.randint(star_height, self.settings.screen_height - star_height)
             self.stars.add(star)
+        self.renderer.set_background(self._bake_background())
+
+    def _bake_background(self):
+        """ Draw the sky with the stars of the quality tier into a background surface """
+        background = pygame.Surface(self.screen.get_size()).convert()
+        background.fill(self.settings.bg_color)
+        stars = self.stars.sprites()
+        for star in stars[:int(len(stars) * self.governor.quality.star_share)]:
+            background.blit(star.image, star.rect)
+        return background
+
+    def _apply_quality(self, quality):
+        """ Scale the optional work to the quality tier chosen by the governor """
+        self.particles.density = quality.particle_share
+        self.sb.set_quality(quality.score_interval, quality.antialias)
+        self.renderer.set_background(self._bake_background())
 
     def _start_game(self):
         """ Start the game if key pressed or mouse clicked """
@@ -218,13 +427,15 @@ class AlienInvasion:
         self.settings.set_start_speed()
         self.sb.prep_images()
         self.stats.game_active = True
+        self.state.set(GameState.PLAYING)
 
-        # Get rid of any remaining aliens and bullets
-        self.aliens.empty()
+        # Get rid of any remaining bullets and explosions
         self.bullets.empty()
+        self.particles.empty()
+        self.rewind.clear()
 
         # Create a new fleet and center the ship
-        self._create_fleet()
+        self.create_fleet()
         self.ship.center_ship()
 
         # Hide the mouse cursor
@@ -232,64 +443,133 @@ class AlienInvasion:
 
     def _ship_hit(self):
         """ Respond to the ship being hit by an alien """
-        if self.stats.ships_left > 0:
+        if self.settings.stress_mode:
+            # Stress mode goes on for as long as it is measured, a hit costs no ship
+            self.state.set(GameState.RESPAWNING, self.settings.respawn_pause, self.respawn)
+        elif self.stats.ships_left > 0:
             # Decrement ships left and update scoreboard
             self.stats.ships_left -= 1
             self.sb.prep_ships()
-            # Clear the screen from remaining aliens and bullets
-            self.bullets.empty()
-            self.aliens.empty()
-
-            # Create new fleet and center the ship.
-            self._create_fleet()
-            self.ship.center_ship()
 
-            # Pause
-            sleep(1)
+            # Pause on the scene of the hit, then start over
+            self.state.set(GameState.RESPAWNING, self.settings.respawn_pause, self.respawn)
         else:
             self._end_game()
 
-    def _update_aliens(self):
-        """ Check if the fleet is at an edge, then update the position of all aliens in the fleet """
-        self._check_fleet_edges()
-        self.aliens.update()
+    def respawn(self):
+        """ Start the next life after the pause of a ship hit """
+        # Clear the screen from remaining bullets, the new fleet replaces the old one
+        self.bullets.empty()
 
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
-            self._ship_hit()
+        # Create new fleet and center the ship. Stress mode keeps the aliens
+        # left and only moves them back up, so levels are still cleared
+        if self.settings.stress_mode:
+            for fleet in self.fleets:
+                fleet.lift()
+        else:
+            self.create_fleet()
+        self.ship.center_ship()
+        self.state.set(GameState.PLAYING)
 
-        # Look for aliens hitting the bottom of the screen
-        self._check_aliens_bottoms()
+    def _update_aliens(self, dt):
+        """ Check if the fleet is at an edge, then update the position of all aliens in the fleet """
+        for fleet in self.fleets:
+            self._check_fleet_edges(fleet)
+            fleet.update(dt)
 
-    def _update_bullets(self):
-        """ Update position of bullets and get rid of old bullets """
-        # Update bullet position
-        self.bullets.update()
+            if fleet.collide_rect(self.ship.rect, self.ship.mask):
+                self._ship_hit()
+                return
+            # Look for aliens hitting the bottom of the screen
+            if self._check_aliens_bottoms(fleet):
+                return
 
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+    def _update_bullets(self, dt):
+        """ Update position of bullets and get rid of old bullets """
+        # Bullets that left the screen are dropped from the front of the pool
+        self.bullets.update(dt)
 
-        self._check_bullet_alien_collisions()
+        with self.profiler.section('collisions'):
+            self._check_bullet_alien_collisions()
 
     def _update_screen(self):
-        """ Update images on the screen and flip to the new screen """
-        self.screen.fill(self.settings.bg_color)
-        self.stars.draw(self.screen)
-        self.ship.blit_me()
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-        self.aliens.draw(self.screen)
-
-        # Draw the score information
-        self.sb.show_score()
+        """ Draw the images of the current frame to the screen """
+        # Moving objects are drawn between their last two simulation states.
+        # While the simulation is paused they stand still at the last one,
+        # only the explosions go on moving
+        alpha = self.loop.alpha if self.state.playing else 1.0
+        self.renderer.begin_frame(self.sb.take_changed_rects())
+        self.renderer.add(self.ship.blit_me(alpha))
+        for rect in self.bullets.draw(alpha):
+            self.renderer.add(rect)
+        for fleet in self.fleets:
+            self.renderer.add(fleet.draw(alpha))
+        self.renderer.add(self.particles.draw(self.loop.alpha))
+
+        # Draw the score information, the text is blended, so it has to be
+        # drawn over the background rather than over itself every frame
+        for rect in self.sb.show_score():
+            self.renderer.add(rect)
 
         # Draw the play button if the game is inactive
         if not self.stats.game_active:
-            self.play_button.draw_button()
-        pygame.display.flip()
+            self.renderer.add(self.play_button.draw_button())
+
+        # Show the frame timings while profiling
+        if self.profiler.enabled:
+            self.renderer.add(self.overlay.draw())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Alien Invasion')
+    parser.add_argument('--seed', type=int, help='seed for the random number generator')
+    parser.add_argument('--record', metavar='FILE', help='record the input of the session')
+    parser.add_argument('--replay', metavar='FILE', help='replay a recorded session at full speed')
+    parser.add_argument('--headless', action='store_true', help='run without a window')
+    parser.add_argument('--stress', action='store_true', help='grow the fleets and bullets every level')
+    parser.add_argument('--threaded', action='store_true', help='draw frames on a separate thread')
+    parser.add_argument('--render-size', metavar='WxH', help='play at this resolution, scaled to the display')
+    parser.add_argument('--profile', metavar='FILE', help='profile every frame and dump the timings')
+    parser.add_argument('--latency', metavar='FILE', help='measure input latency, dump it and print histograms')
+    parser.add_argument('--startup-report', action='store_true', help='print how long starting the game took')
+    args = parser.parse_args()
+
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+    player = InputPlayer(args.replay) if args.replay else None
+    settings = Settings(seed=player.seed if player else args.seed)
+    if args.profile:
+        settings.profiling = True
+        settings.profile_path = args.profile
+    settings.report_startup = args.startup_report
+    settings.latency_tracking = bool(args.latency)
+    settings.threaded_rendering = args.threaded
+    settings.stress_mode = args.stress
+    if args.render_size:
+        width, height = args.render_size.lower().split('x')
+        settings.render_size = (int(width), int(height))
+    # A replay plays by the settings of the recorded session
+    if player:
+        player.configure(settings)
+        settings.target_fps = 0
+
+    # Create game instance and run it
+    ai = AlienInvasion(settings)
+    if player:
+        ai.input = player
+    elif args.record:
+        ai.input = InputRecorder(ai.input, args.record, settings, ai.renderer.to_screen)
+
+    try:
+        ai.run_game()
+    finally:
+        if args.profile:
+            ai.profiler.dump(args.profile)
+        if args.latency:
+            ai.latency.dump(args.latency)
+            print('\n'.join(ai.latency.report()))
 
 
 if __name__ == '__main__':
-    # Create game instance and run it
-    ai = AlienInvasion()
-    ai.run_game()
+    main()
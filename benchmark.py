@@ -0,0 +1,229 @@
+""" Headless benchmark for Alien Invasion
+
+Boots the game under the SDL dummy video driver, drives it with scripted
+key presses and reports frame rates and time spent in each phase.
+
+    python benchmark.py --resolutions 1280x720 1920x1080 --frames 1200
+
+A run can start from a snapshot saved by an earlier one, e.g. to measure a
+late level without playing up to it every time:
+
+    python benchmark.py --resolutions 1280x720 --scenarios fire --save-state level.snap
+    python benchmark.py --resolutions 1280x720 --scenarios fire --warm-start level.snap
+"""
+import argparse
+import json
+import os
+import statistics
+from time import perf_counter
+
+# The dummy driver has to be chosen before pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from game.settings import Settings
+from utils.snapshot import restore_snapshot, take_snapshot
+
+
+# Frames the ship moves one way, long enough to cross a 1920 pixel wide
+# screen, so the edge columns of a wide fleet are reached too
+SWEEP_FRAMES = 800
+
+
+def key_press(key):
+    """ Return the events of pressing a key """
+    return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=''),
+            pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode='')]
+
+
+def scenario_idle(frame):
+    """ Leave the game on the Play screen """
+    return []
+
+
+def scenario_fire(frame):
+    """ Start a game, sweep the ship from side to side and keep firing """
+    events = []
+    if frame == 0:
+        events += key_press(pygame.K_p)
+    # The first sweep starts from the center and is half as long
+    sweep = (frame + SWEEP_FRAMES // 2) % (2 * SWEEP_FRAMES)
+    if frame == 0 or sweep == 0:
+        events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_LEFT, mod=0, unicode=''))
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT, mod=0, unicode=''))
+    elif sweep == SWEEP_FRAMES:
+        events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_RIGHT, mod=0, unicode=''))
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT, mod=0, unicode=''))
+    if frame % 5 == 0:
+        events += key_press(pygame.K_SPACE)
+    return events
+
+
+def scenario_level_skip(frame):
+    """ Skip ahead a few levels with Page Up, then play like scenario_fire """
+    if frame == 0:
+        return key_press(pygame.K_PAGEUP) * 4 + scenario_fire(frame)
+    return scenario_fire(frame)
+
+
+SCENARIOS = {
+    'idle': scenario_idle,
+    'fire': scenario_fire,
+    'level-skip': scenario_level_skip,
+}
+
+
+def make_settings(width, height, args):
+    """ Return settings for a windowed, unthrottled, one tick per frame run """
+    settings = Settings(seed=args.seed)
+    settings.fullscreen = False
+    settings.screen_width = width
+    settings.screen_height = height
+    settings.target_fps = 0
+    settings.lockstep = True
+    settings.dirty_rendering = args.dirty
+    settings.render_size = args.render_size
+    settings.hardware_scaling = not args.software_scaling
+    settings.threaded_rendering = args.threaded
+    settings.stress_mode = args.stress
+    # Measurements stay comparable unless the governor is asked for
+    settings.adaptive_quality = args.adaptive
+    settings.bullets_allowed = args.bullets
+    settings.profiling = True
+    settings.latency_tracking = args.latency
+    settings.leaderboard_path = None
+    settings.quicksave_path = None
+    return settings
+
+
+def run(width, height, scenario, args):
+    """ Run one scenario and return its measurements """
+    start = perf_counter()
+    ai_game = AlienInvasion(make_settings(width, height, args))
+    startup = perf_counter() - start
+
+    # A warm start is already playing, the scenario must not start over
+    warm_start = None
+    if args.warm_start:
+        with open(args.warm_start, 'rb') as f:
+            restore_snapshot(ai_game, f.read())
+        warm_start = ai_game.stats.level
+
+    # The fleets change size as the scenario plays, e.g. in stress mode
+    most_aliens = most_bullets = 0
+
+    # Only the frames of the scenario are measured, not the startup
+    profiler = ai_game.profiler
+    profiler.reset()
+
+    script = SCENARIOS[scenario]
+    for frame in range(args.frames):
+        for event in script(frame):
+            if warm_start and event.type == pygame.KEYDOWN and event.key in (pygame.K_p, pygame.K_PAGEUP):
+                continue
+            pygame.event.post(event)
+        ai_game._run_frame()
+        most_aliens = max(most_aliens, sum(len(fleet) for fleet in ai_game.fleets))
+        most_bullets = max(most_bullets, len(ai_game.bullets))
+    ai_game.renderer.close()
+
+    if args.save_state:
+        with open(args.save_state, 'wb') as f:
+            f.write(take_snapshot(ai_game))
+
+    frame_times = [sample['frame'] for sample in profiler.samples]
+    total = sum(frame_times)
+    return {
+        'resolution': '{}x{}'.format(width, height),
+        'scenario': scenario,
+        'warm_start_level': warm_start,
+        'aliens': most_aliens,
+        'bullets': most_bullets,
+        'startup_ms': startup * 1000,
+        'startup_phases': {name: seconds * 1000 for name, seconds in ai_game.startup.phases},
+        'fps': len(frame_times) / total,
+        'frame_p50_ms': statistics.median(frame_times) * 1000,
+        'frame_p95_ms': sorted(frame_times)[int(len(frame_times) * 0.95)] * 1000,
+        'score': ai_game.stats.score,
+        # With a render thread, frames it skipped are never drawn
+        'frames_drawn': getattr(ai_game.renderer, 'frames_drawn', len(frame_times)),
+        'quality': ai_game.governor.quality.name,
+        'quality_changes': ai_game.governor.history,
+        'latency': ai_game.latency.summary(),
+        'phases': {
+            name: phase_timings([sample.get(name, 0.0) for sample in profiler.samples])
+            for name in profiler.phases if name != 'frame'
+        },
+    }
+
+
+def phase_timings(times):
+    """ Summarize the per-frame times of one phase in ms """
+    active = sorted(time for time in times if time)
+    return {
+        'frames': len(active),
+        'mean_ms': statistics.mean(active) * 1000 if active else 0.0,
+        'p95_ms': active[int(len(active) * 0.95)] * 1000 if active else 0.0,
+        'ms_per_frame': sum(active) * 1000 / len(times),
+    }
+
+
+def print_result(result):
+    """ Print one result as a small table """
+    print('{resolution} {scenario}: {aliens} aliens, {bullets} bullets, {fps:.0f} fps, '
+          'p50 {frame_p50_ms:.2f} ms, p95 {frame_p95_ms:.2f} ms, '
+          'startup {startup_ms:.0f} ms, score {score}, {frames_drawn} frames drawn, '
+          'quality {quality}'.format(**result))
+    for phase, timing in result['phases'].items():
+        print('    {:<12} {:>7} frames {:>9.3f} ms mean {:>9.3f} ms p95 {:>9.3f} ms/frame'.format(
+            phase, timing['frames'], timing['mean_ms'], timing['p95_ms'], timing['ms_per_frame']))
+    for name, latency in result['latency'].items():
+        print('    {:<12} {:>7} inputs {:>9.3f} ms p50 {:>9.3f} ms p95 {:>9.3f} ms max'.format(
+            name, latency['count'], latency['p50_ms'], latency['p95_ms'], latency['max_ms']))
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', type=parse_resolution,
+                        default=[(1280, 720), (1920, 1080), (3840, 2160)])
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--bullets', type=int, default=Settings().bullets_allowed,
+                        help='number of bullets allowed on screen')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dirty', action='store_true', help='use dirty-rectangle rendering')
+    parser.add_argument('--render-size', type=parse_resolution,
+                        help='play at this resolution and scale it to the window')
+    parser.add_argument('--software-scaling', action='store_true',
+                        help='scale from an offscreen surface instead of letting SDL scale')
+    parser.add_argument('--threaded', action='store_true', help='draw frames on a separate thread')
+    parser.add_argument('--stress', action='store_true', help='play in stress mode, heavier every level')
+    parser.add_argument('--adaptive', action='store_true', help='let the quality governor lower detail')
+    parser.add_argument('--latency', action='store_true', help='measure input to display latency')
+    parser.add_argument('--warm-start', metavar='FILE', help='start every run from a saved snapshot')
+    parser.add_argument('--save-state', metavar='FILE', help='save a snapshot at the end of every run')
+    parser.add_argument('--json', metavar='FILE', help='also write the results to a JSON file')
+    args = parser.parse_args()
+
+    results = []
+    for width, height in args.resolutions:
+        for scenario in args.scenarios:
+            result = run(width, height, scenario, args)
+            print_result(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+""" Pack all sprite images into one atlas image
+
+Every sprite in game.assets.SPRITES is rotated as the game needs it and
+packed into images/atlas.png, with the position of each sprite written to
+images/atlas.idx. The game then loads the single atlas image at startup.
+Run it again whenever a sprite image changes.
+
+    python build_atlas.py
+"""
+import argparse
+import os
+
+# Loading and saving images works without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from game import assets
+from game.atlas_index import ATLAS_INDEX, write_index
+
+
+def pack(sizes, width, padding=1):
+    """ Return a rect for each size, placed on shelves of the width, and the total height
+
+    Sizes are placed tallest first, left to right, starting a new shelf
+    when a row is full.
+    """
+    rects = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > width and x > 0:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        rects[name] = pygame.Rect(x, y, w, h)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return rects, y + shelf_height
+
+
+def build(image_path=assets.ATLAS_IMAGE, index_path=ATLAS_INDEX, width=256):
+    """ Build the atlas and return the rects of the sprites in it """
+    images = {name: assets.load_sprite(name) for name in assets.SPRITES}
+    width = max(width, max(image.get_width() for image in images.values()))
+    rects, height = pack({name: image.get_size() for name, image in images.items()}, width)
+
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    for name, image in images.items():
+        # Copy the pixels as they are, alpha included
+        atlas.blit(image, rects[name], special_flags=pygame.BLEND_RGBA_MAX)
+
+    pygame.image.save(atlas, image_path)
+    write_index(rects, index_path)
+    return rects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=256, help='width of the atlas image')
+    args = parser.parse_args()
+
+    pygame.display.init()
+    rects = build(width=args.width)
+    for name, rect in rects.items():
+        print('{:<14} {}'.format(name, tuple(rect)))
+
+
+if __name__ == '__main__':
+    main()
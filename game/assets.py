@@ -0,0 +1,90 @@
+import os
+
+import pygame
+
+from game.atlas_index import ATLAS_INDEX, read_index
+
+
+# Every sprite image the game uses: name -> (file, rotation in degrees)
+SPRITES = {
+    'alien': ('images/alien.png', 90),
+    'ship': ('images/ship1.png', 0),
+    'star': ('images/star.png', 0),
+    # Not drawn by the game at the moment, but packed into the atlas as well
+    'ship_classic': ('images/ship.bmp', 0),
+    'rocket': ('images/rocket.png', 0),
+    'raindrop': ('images/raindrop.png', 0),
+}
+
+# All sprites packed into one image by build_atlas.py, see game.atlas_index
+# for the index of where each sprite is in it
+ATLAS_IMAGE = 'images/atlas.png'
+
+_images = {}
+_masks = {}
+_atlas = None
+
+
+def get_image(name):
+    """ Return the shared surface for the sprite, loading it on first use
+
+    Sprites come from the atlas if it has been built, and are loaded from
+    their own files otherwise.
+    """
+    image = _images.get(name)
+    if image is None:
+        atlas, rects = _get_atlas()
+        if name in rects:
+            # Sprites in the atlas are already rotated
+            image = atlas.subsurface(rects[name])
+        else:
+            image = load_sprite(name)
+            # Pixel format conversion needs a display mode to be set
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+        _images[name] = image
+    return image
+
+
+def get_mask(name):
+    """ Return the shared collision mask of the sprite's opaque pixels """
+    mask = _masks.get(name)
+    if mask is None:
+        mask = _masks[name] = pygame.mask.from_surface(get_image(name))
+    return mask
+
+
+def get_size(name):
+    """ Return the width and height of the sprite """
+    return get_image(name).get_size()
+
+
+def load_sprite(name):
+    """ Load the sprite from its own file and rotate it """
+    path, angle = SPRITES[name]
+    image = pygame.image.load(path)
+    if angle:
+        image = pygame.transform.rotate(image, angle)
+    return image
+
+
+def _get_atlas():
+    """ Return the atlas image and its index, both empty if there is no atlas """
+    global _atlas
+    if _atlas is None:
+        if os.path.exists(ATLAS_INDEX):
+            image = pygame.image.load(ATLAS_IMAGE)
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+            _atlas = (image, read_index())
+        else:
+            _atlas = (None, {})
+    return _atlas
+
+
+def clear_cache():
+    """ Forget all loaded images, e.g. after the display mode has changed """
+    global _atlas
+    _images.clear()
+    _masks.clear()
+    _atlas = None
@@ -0,0 +1,48 @@
+""" The index of the sprite atlas, readable without pygame """
+import struct
+
+
+ATLAS_INDEX = 'images/atlas.idx'
+
+# Index file header: magic, format version, number of sprites
+INDEX_HEADER = struct.Struct('<4sBH')
+INDEX_MAGIC = b'AIAT'
+INDEX_VERSION = 1
+# One sprite: name length, followed by the name and its rect in the atlas
+INDEX_NAME = struct.Struct('<B')
+INDEX_RECT = struct.Struct('<HHHH')
+
+
+def read_index(path=ATLAS_INDEX):
+    """ Return the rects (x, y, width, height) of the sprites in the atlas by name """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, count = INDEX_HEADER.unpack_from(data)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        raise ValueError("'{}' is not a sprite atlas index".format(path))
+
+    rects = {}
+    offset = INDEX_HEADER.size
+    for _ in range(count):
+        length, = INDEX_NAME.unpack_from(data, offset)
+        offset += INDEX_NAME.size
+        name = data[offset:offset + length].decode('ascii')
+        offset += length
+        rects[name] = INDEX_RECT.unpack_from(data, offset)
+        offset += INDEX_RECT.size
+    return rects
+
+
+def write_index(rects, path=ATLAS_INDEX):
+    """ Write the rects of the sprites in the atlas """
+    data = [INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(rects))]
+    for name, rect in rects.items():
+        encoded = name.encode('ascii')
+        data.append(INDEX_NAME.pack(len(encoded)) + encoded + INDEX_RECT.pack(*rect))
+    with open(path, 'wb') as f:
+        f.write(b''.join(data))
+
+
+def sprite_size(name, path=ATLAS_INDEX):
+    """ Return the width and height of a sprite as packed in the atlas """
+    return tuple(read_index(path)[name][2:])
@@ -1,29 +1,142 @@
+import numpy as np
 import pygame
-from pygame.sprite import Sprite
 
 
-class Bullet(Sprite):
-    """ A class to manage bullets fired from the ship """
+class BulletPool:
+    """ A class to manage bullets fired from the ship
+
+    Bullets live in preallocated arrays used as a ring buffer in firing
+    order. All bullets fly at the same speed, so the oldest bullet is always
+    the highest one and bullets leave the screen from the front of the ring.
+    """
+
     def __init__(self, ai_game):
-        super().__init__()
+        """ Initialize an empty pool sized for the bullets allowed """
         self.screen = ai_game.screen
         self.settings = ai_game.settings
+        self.ship = ai_game.ship
         self.color = self.settings.bullet_color
+        self.width = self.settings.bullet_width
+        self.height = self.settings.bullet_height
+        # Bullets are solid, so every pixel of their rect collides
+        self.mask = pygame.Mask((self.width, self.height))
+        self.mask.fill()
+
+        self.capacity = 0
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0)
+        self.prev_y = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        self.head = 0
+        self.count = 0  # Slots in use from head, including removed bullets
+        self.alive_count = 0
+        self._reserve(self.settings.bullets_allowed)
+
+    def __len__(self):
+        return self.alive_count
+
+    def empty(self):
+        """ Remove all bullets """
+        self.alive[:] = False
+        self.head = self.count = self.alive_count = 0
+
+    def fire(self):
+        """ Fire a bullet from the top of the ship if one is allowed """
+        allowed = self.settings.bullets_allowed + self.settings.extra_bullets
+        if self.alive_count >= allowed:
+            return False
+        if self.count == self.capacity:
+            # Slots of bullets removed in the middle of the ring are reused
+            self._reserve(allowed)
+
+        slot = (self.head + self.count) % self.capacity
+        self.x[slot] = self.ship.rect.centerx - self.width // 2
+        self.y[slot] = self.prev_y[slot] = self.ship.rect.top
+        self.alive[slot] = True
+        self.count += 1
+        self.alive_count += 1
+        return True
+
+    def update(self, dt):
+        """ Move all bullets up the screen and drop the ones that left it """
+        # Moving free slots too is cheaper than selecting the used ones
+        self.prev_y[:] = self.y
+        self.y -= self.settings.bullet_speed * dt
+
+        while self.count:
+            head = self.head
+            if self.alive[head]:
+                if int(self.y[head]) + self.height > 0:
+                    break
+                self.alive[head] = False
+                self.alive_count -= 1
+            self.head = (head + 1) % self.capacity
+            self.count -= 1
+
+    def slots(self):
+        """ Yield the slots of the living bullets, oldest first """
+        for i in range(self.count):
+            slot = (self.head + i) % self.capacity
+            if self.alive[slot]:
+                yield slot
+
+    def rect(self, slot):
+        """ Return the rect of the bullet in the slot """
+        return pygame.Rect(int(self.x[slot]), int(self.y[slot]), self.width, self.height)
+
+    def remove(self, slot):
+        """ Remove the bullet in the slot, e.g. after it hit an alien """
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.alive_count -= 1
+
+    def get_state(self):
+        """ Return the x, y and previous y of the living bullets, oldest first """
+        order = list(self.slots())
+        return self.x[order], self.y[order], self.prev_y[order]
+
+    def set_state(self, x, y, prev_y):
+        """ Replace the bullets by living bullets at the given positions, oldest first """
+        count = len(x)
+        self.empty()
+        self._reserve(max(count, self.capacity))
+        self.x[:count] = x
+        self.y[:count] = y
+        self.prev_y[:count] = prev_y
+        self.alive[:count] = True
+        self.count = self.alive_count = count
 
-        # Create a bullet rect at (0, 0) and then set the correct position
-        self.rect = pygame.Rect(0, 0, self.settings.bullet_width, self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+    def draw(self, alpha=1.0):
+        """ Draw the bullets between their previous and current positions """
+        ys = self.prev_y + (self.y - self.prev_y) * alpha
+        screen_rect = self.screen.get_rect()
+        rects = []
+        for slot in self.slots():
+            # Bullets leaving the screen are cut off at the top edge, pygame 2
+            # would otherwise fill them shifted down
+            rect = pygame.Rect(int(self.x[slot]), int(ys[slot]), self.width, self.height).clip(screen_rect)
+            if rect:
+                rects.append(self.screen.fill(self.color, rect))
+        return rects
 
-        # Store the bullet's position as a decimal value
-        self.y = float(self.rect.y)
+    def _reserve(self, capacity):
+        """ Move the living bullets to the front of arrays of at least capacity """
+        order = list(self.slots())
+        count = len(order)
+        x, y, prev_y = self.x[order], self.y[order], self.prev_y[order]
 
-    def update(self):
-        """ Move the bullet up the screen """
-        # Update the decimal position of the bullet
-        self.y -= self.settings.bullet_speed
-        # Update the rect position
-        self.rect.y = self.y
+        capacity = max(capacity, count, 1)
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self.x = np.zeros(capacity, dtype=np.int32)
+            self.y = np.zeros(capacity)
+            self.prev_y = np.zeros(capacity)
+            self.alive = np.zeros(capacity, dtype=bool)
 
-    def draw_bullet(self):
-        """ Draw the bullet to the screen """
-        pygame.draw.rect(self.screen, self.color, self.rect)
+        self.x[:count] = x
+        self.y[:count] = y
+        self.prev_y[:count] = prev_y
+        self.alive[:] = False
+        self.alive[:count] = True
+        self.head = 0
+        self.count = self.alive_count = count
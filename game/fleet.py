@@ -0,0 +1,232 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from game import assets
+from game.formation import Formation
+from game.spatial_hash import SpatialHash
+
+
+class Fleet:
+    """ A class to move the whole alien fleet at once
+
+    Every alien keeps its starting position in NumPy arrays and the fleet
+    moves rigidly, so the position of any alien is its starting position
+    plus the common fleet offset.
+
+    Each layout is set up once. Building it again shares the arrays, copies
+    the grid and only redraws the aliens shot down since the last build
+    into its image, so new levels and respawns cost next to nothing. The
+    most recently built layouts are kept.
+    """
+
+    # Layouts kept set up, stress mode changes the layout every level
+    MAX_TEMPLATES = 4
+
+    def __init__(self, ai_game, direction=None):
+        """ Initialize an empty fleet
+
+        Without a direction of its own the fleet moves in the direction of
+        the settings.
+        """
+        self.screen = ai_game.screen
+        self.screen_rect = ai_game.screen.get_rect()
+        self.settings = ai_game.settings
+        self._direction = direction
+
+        # All aliens share the mask of their image for pixel collisions
+        self.mask = assets.get_mask('alien') if self.settings.pixel_collisions else None
+
+        # Pristine state of the recently built layouts, see _template()
+        self._templates = OrderedDict()
+
+        self.build([], [])
+
+    def __len__(self):
+        return self.alive_count
+
+    def build(self, xs, ys):
+        """ Replace the fleet by aliens whose rects start at the given positions """
+        # The base arrays are never written to, so they are shared
+        self.base_x, self.base_y, grid, pristine, self.formation = self._template(xs, ys)
+        self.alive = np.ones(len(self.base_x), dtype=bool)
+        self.alive_count = len(self.base_x)
+
+        # Horizontal offset is a decimal value to move the fleet smoothly
+        self.offset_x = 0.0
+        self.offset_y = 0
+        # Offset at the previous simulation tick, used to interpolate drawing
+        self.prev_offset_x = self.offset_x
+
+        # Shot down aliens are removed from a copy of the grid and from
+        # the image of the layout, which is restored from a pristine copy
+        self.grid = grid.copy()
+        self.formation.restore(pristine)
+
+        self._update_bounds()
+
+    def _template(self, xs, ys):
+        """ Return the base arrays, grid, pristine and working formation of a layout """
+        key = (tuple(xs), tuple(ys))
+        template = self._templates.get(key)
+        if template is not None:
+            self._templates.move_to_end(key)
+        else:
+            self.alien_width, self.alien_height = assets.get_size('alien')
+            base_x = np.array(xs, dtype=np.int32)
+            base_y = np.array(ys, dtype=np.int32)
+            base_x.flags.writeable = False
+            base_y.flags.writeable = False
+
+            # Bucket the aliens by column so a bullet only tests its neighbours
+            grid = SpatialHash(self.alien_width)
+            for index, x in enumerate(key[0]):
+                grid.insert(index, x, self.alien_width)
+
+            # The fleet is drawn from one composited surface
+            pristine = Formation(assets.get_image('alien'), key[0], key[1])
+
+            # With a render thread, the drawn image may still be in use by it
+            working = pristine.copy()
+            working.copy_on_write = self.settings.threaded_rendering
+            template = self._templates[key] = (base_x, base_y, grid, pristine, working)
+            if len(self._templates) > self.MAX_TEMPLATES:
+                self._templates.popitem(last=False)
+        return template
+
+    def remove(self, indices):
+        """ Remove shot down aliens from the fleet """
+        for index in indices:
+            if self.alive[index]:
+                self.alive[index] = False
+                self.alive_count -= 1
+                self.grid.remove(index, int(self.base_x[index]), self.alien_width)
+                self.formation.erase(int(self.base_x[index]), int(self.base_y[index]))
+        self._update_bounds()
+
+    def get_state(self):
+        """ Return the offsets, direction and living aliens of the fleet """
+        return self.offset_x, self.prev_offset_x, self.offset_y, self.direction, self.alive.copy()
+
+    def set_state(self, offset_x, prev_offset_x, offset_y, direction, alive):
+        """ Move the freshly built fleet and remove the aliens not alive """
+        if len(alive) != len(self.alive):
+            raise ValueError('state of a fleet of {} aliens, the fleet has {}'.format(len(alive), len(self.alive)))
+        self.remove(np.flatnonzero(~alive).tolist())
+        self.offset_x = offset_x
+        self.prev_offset_x = prev_offset_x
+        self.offset_y = offset_y
+        self.direction = direction
+
+    def hits(self, rect, mask=None):
+        """ Return the indices of the living aliens that overlap the rect
+
+        With a mask for the rect, only aliens whose opaque pixels overlap the
+        mask count once their rects overlap.
+        """
+        # Nothing to find above or below the living aliens
+        if (not self.alive_count or rect.top >= self.bottom + self.offset_y + self.alien_height or
+                rect.bottom <= self.top + self.offset_y):
+            return []
+
+        # Look up the columns under the rect in fleet coordinates, widened by a
+        # pixel on each side to cover rounding of the fleet offset
+        shift = int(self.offset_x)
+        candidates = np.array(self.grid.query(rect.left - shift - 1, rect.right - shift + 1), dtype=np.intp)
+
+        xs = (self.base_x[candidates] + self.offset_x).astype(np.int32)
+        ys = self.base_y[candidates] + self.offset_y
+        overlap = ((xs < rect.right) & (xs + self.alien_width > rect.left) &
+                   (ys < rect.bottom) & (ys + self.alien_height > rect.top))
+        # Only the few aliens whose rects overlap are tested pixel by pixel
+        return [index for index, x, y in zip(candidates[overlap].tolist(), xs[overlap].tolist(),
+                                             ys[overlap].tolist())
+                if self._masks_overlap(x, y, rect, mask)]
+
+    def check_edges(self):
+        """ Return True if the fleet has reached an edge of the screen """
+        if not self.alive_count:
+            return False
+        left = int(self.left + self.offset_x)
+        right = int(self.right + self.offset_x) + self.alien_width
+        return right >= self.screen_rect.right or left <= 0
+
+    def check_bottom(self):
+        """ Return True if any alien has reached the bottom of the screen """
+        if not self.alive_count:
+            return False
+        return self.bottom + self.offset_y + self.alien_height >= self.screen_rect.bottom
+
+    @property
+    def direction(self):
+        """ 1 while the fleet moves right, -1 while it moves left """
+        return self.settings.fleet_direction if self._direction is None else self._direction
+
+    @direction.setter
+    def direction(self, direction):
+        if self._direction is None:
+            self.settings.fleet_direction = direction
+        else:
+            self._direction = direction
+
+    def lift(self):
+        """ Move the fleet back to where it started, keeping the aliens left """
+        self.offset_x = self.prev_offset_x = 0.0
+        self.offset_y = 0
+
+    def drop(self):
+        """ Move the entire fleet down """
+        self.offset_y += self.settings.fleet_drop_speed
+
+    def update(self, dt):
+        """ Move the fleet right or left """
+        self.prev_offset_x = self.offset_x
+        self.offset_x += self.settings.alien_speed * self.direction * dt
+
+    def draw(self, alpha=1.0):
+        """ Draw the fleet with a single blit and return the drawn rect """
+        if self.alive_count:
+            offset_x = self.prev_offset_x + (self.offset_x - self.prev_offset_x) * alpha
+            return self.formation.draw(self.screen, offset_x, self.offset_y)
+
+    def collide_rect(self, rect, mask=None):
+        """ Return True if any living alien overlaps the rect, or its mask if given """
+        xs, ys = self.positions()
+        hits = ((xs < rect.right) & (xs + self.alien_width > rect.left) &
+                (ys < rect.bottom) & (ys + self.alien_height > rect.top))
+        # Only the few aliens whose rects overlap are tested pixel by pixel
+        for index in np.flatnonzero(hits & self.alive).tolist():
+            if self._masks_overlap(int(xs[index]), int(ys[index]), rect, mask):
+                return True
+        return False
+
+    def _masks_overlap(self, x, y, rect, mask):
+        """ Return True if the alien at (x, y) overlaps the mask placed at the rect """
+        if mask is None or self.mask is None:
+            return True
+        return self.mask.overlap(mask, (rect.x - x, rect.y - y)) is not None
+
+    def centers(self, indices):
+        """ Return the current x and y centers of the aliens at the indices """
+        indices = np.asarray(indices, dtype=np.intp)
+        xs = (self.base_x[indices] + self.offset_x).astype(np.int32) + self.alien_width // 2
+        ys = self.base_y[indices] + self.offset_y + self.alien_height // 2
+        return xs, ys
+
+    def positions(self):
+        """ Return the current rect positions of all aliens """
+        xs = (self.base_x + self.offset_x).astype(np.int32)
+        ys = self.base_y + self.offset_y
+        return xs, ys
+
+    def _update_bounds(self):
+        """ Find the bounding box of the living aliens at zero offset """
+        if self.alive_count:
+            alive_x = self.base_x[self.alive]
+            self.left = int(alive_x.min())
+            self.right = int(alive_x.max())
+            alive_y = self.base_y[self.alive]
+            self.top = int(alive_y.min())
+            self.bottom = int(alive_y.max())
+        else:
+            self.left = self.right = self.top = self.bottom = 0
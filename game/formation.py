@@ -0,0 +1,79 @@
+import pygame
+
+
+class Formation:
+    """ A single pre-composited image of the whole fleet
+
+    The aliens are drawn into one surface when the fleet is created, shot
+    down aliens are erased from it, and the fleet is drawn with one blit.
+
+    With copy_on_write set, a surface that has been drawn is never changed
+    again: the next change goes to a copy of it. A render thread may still
+    be drawing the old surface from a recorded frame.
+    """
+
+    def __init__(self, image, xs, ys):
+        """ Composite the image at every position of the fleet """
+        self.image_rect = image.get_rect()
+        width, height = self.image_rect.size
+
+        if len(xs):
+            self.left, self.top = min(xs), min(ys)
+            size = (max(xs) - self.left + width, max(ys) - self.top + height)
+        else:
+            self.left, self.top = 0, 0
+            size = (0, 0)
+
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        for x, y in zip(xs, ys):
+            self.surface.blit(image, (x - self.left, y - self.top))
+
+        # Areas cleared by erase() since the formation was last restored
+        self.erased = []
+
+        self.copy_on_write = False
+        self._drawn = False
+
+    def copy(self):
+        """ Return a formation with its own copy of the composited image """
+        formation = Formation.__new__(Formation)
+        formation.image_rect = self.image_rect
+        formation.left, formation.top = self.left, self.top
+        formation.surface = self.surface.copy()
+        formation.erased = []
+        formation.copy_on_write = self.copy_on_write
+        formation._drawn = False
+        return formation
+
+    def erase(self, x, y):
+        """ Clear the alien drawn at the fleet position (x, y) """
+        rect = self.image_rect.move(x - self.left, y - self.top)
+        self._prepare_change()
+        self.surface.fill((0, 0, 0, 0), rect)
+        self.erased.append(rect)
+
+    def restore(self, source):
+        """ Copy the erased aliens back from a formation of the same layout """
+        if self.erased:
+            self._prepare_change()
+        for rect in self.erased:
+            # The area is cleared, so taking the maximum copies the pixels exactly
+            self.surface.blit(source.surface, rect, rect, special_flags=pygame.BLEND_RGBA_MAX)
+        self.erased = []
+
+    def get_rect(self, offset_x, offset_y):
+        """ Return the screen rect of the formation at the fleet offset """
+        rect = self.surface.get_rect()
+        rect.topleft = (int(self.left + offset_x), self.top + offset_y)
+        return rect
+
+    def draw(self, screen, offset_x, offset_y):
+        """ Draw the whole fleet at the fleet offset """
+        self._drawn = True
+        return screen.blit(self.surface, self.get_rect(offset_x, offset_y))
+
+    def _prepare_change(self):
+        """ Make the surface safe to change, copying it if it has been drawn """
+        if self.copy_on_write and self._drawn:
+            self.surface = self.surface.copy()
+            self._drawn = False
@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+
+def pitch(size, density=1.0):
+    """ Return the distance between neighbouring aliens of the size
+
+    At density 1 the space between aliens is one alien, at density 2 and
+    above they touch.
+    """
+    return max(size, int(2 * size / density))
+
+
+@lru_cache(maxsize=16)
+def fleet_layout(screen_width, screen_height, alien_size, ship_height, density=1.0, extra_rows=0):
+    """ Return the x and y positions of the aliens of a full fleet, row by row
+
+    A higher density packs the aliens closer together in rows of the same
+    width, and extra rows are added below the rows that fit, as long as two aliens of room are left
+    above the ship. Layouts are cached, so every fleet on the same screen
+    gets the very same tuples back.
+    """
+    # Spacing between each alien is equal to one alien width
+    alien_width, alien_height = alien_size
+    column_pitch, row_pitch = pitch(alien_width, density), pitch(alien_height, density)
+    # Defying the number of alien to fill all available space in a row
+    available_space_in_row = screen_width - 2 * alien_width
+    # Denser rows are as wide as normal ones, so the fleet keeps the same
+    # room to move before it drops
+    normal_pitch = pitch(alien_width)
+    row_width = (available_space_in_row // normal_pitch - 1) * normal_pitch
+    number_aliens_in_row = row_width // column_pitch + 1
+    # Determine a number of rows of alien to fit the screen
+    available_space_for_rows = screen_height - ship_height - (5 * alien_height)
+    number_of_rows = available_space_for_rows // row_pitch
+    if extra_rows:
+        most_rows = (screen_height - ship_height - 3 * alien_height) // row_pitch
+        number_of_rows = max(number_of_rows, min(number_of_rows + extra_rows, most_rows))
+
+    xs, ys = [], []
+    for row_number in range(number_of_rows):
+        for alien_number in range(number_aliens_in_row):
+            xs.append(alien_width + column_pitch * alien_number)
+            ys.append(alien_height + row_pitch * row_number)
+    return tuple(xs), tuple(ys)
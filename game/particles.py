@@ -0,0 +1,111 @@
+import numpy as np
+import pygame
+
+
+class ParticleSystem:
+    """ A class to manage the explosion particles of destroyed aliens
+
+    Particles live in preallocated arrays with the living ones packed at the
+    front. They are moved and culled for all particles at once, and drawn
+    with a single batched blit.
+    """
+
+    # Number of images the particles fade through over their lifetime
+    FADE_STEPS = 4
+
+    def __init__(self, ai_game):
+        """ Initialize an empty system with room for the configured particles """
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.size = self.settings.particle_size
+
+        capacity = self.settings.particle_capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)  # Seconds left to live
+        self.count = 0
+
+        # Share of the configured particles emitted, lowered on slow machines
+        self.density = 1.0
+
+        # Its own generator keeps the game's random sequence unchanged
+        self.random = np.random.RandomState(self.settings.seed)
+
+        # The most faded image first, the particle color last
+        self.images = []
+        for step in range(1, self.FADE_STEPS + 1):
+            image = pygame.Surface((self.size, self.size))
+            image.fill(self.settings.particle_color)
+            image.set_alpha(255 * step // self.FADE_STEPS)
+            self.images.append(image)
+
+    def __len__(self):
+        return self.count
+
+    def empty(self):
+        """ Remove all particles """
+        self.count = 0
+
+    def emit(self, xs, ys):
+        """ Burst particles out of each of the points (xs[i], ys[i]) """
+        settings = self.settings
+        per_point = int(settings.particles_per_alien * self.density)
+        number = min(len(xs) * per_point, len(self.x) - self.count)
+        if number <= 0:
+            return
+
+        start, end = self.count, self.count + number
+        self.x[start:end] = np.repeat(np.asarray(xs, dtype=float), per_point)[:number]
+        self.y[start:end] = np.repeat(np.asarray(ys, dtype=float), per_point)[:number]
+        self.prev_x[start:end] = self.x[start:end]
+        self.prev_y[start:end] = self.y[start:end]
+
+        # Random directions, speeds and lifetimes make the bursts look ragged
+        angles = self.random.uniform(0.0, 2 * np.pi, number)
+        speeds = self.random.uniform(0.2, 1.0, number) * settings.particle_speed
+        self.vx[start:end] = np.cos(angles) * speeds
+        self.vy[start:end] = np.sin(angles) * speeds
+        self.life[start:end] = self.random.uniform(0.5, 1.0, number) * settings.particle_lifetime
+        self.count = end
+
+    def update(self, dt):
+        """ Move all particles and drop the ones that burnt out """
+        n = self.count
+        if not n:
+            return
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.life[:n] -= dt
+
+        alive = self.life[:n] > 0
+        if not alive.all():
+            # Pack the living particles at the front of the arrays
+            self.count = int(alive.sum())
+            for array in (self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy, self.life):
+                array[:self.count] = array[:n][alive]
+
+    def draw(self, alpha=1.0):
+        """ Draw the particles with one batched blit and return the area they cover """
+        n = self.count
+        if not n:
+            return None
+        xs = (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha).astype(np.int32)
+        ys = (self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha).astype(np.int32)
+
+        # Particles fade out over the last half of the longest lifetime
+        steps = np.minimum(self.life[:n] * self.FADE_STEPS / self.settings.particle_lifetime * 2,
+                           self.FADE_STEPS - 1).astype(np.int32)
+        images = self.images
+        self.screen.blits([(images[step], position)
+                           for step, position in zip(steps.tolist(), zip(xs.tolist(), ys.tolist()))],
+                          doreturn=False)
+
+        left, top = int(xs.min()), int(ys.min())
+        rect = pygame.Rect(left, top, int(xs.max()) - left + self.size, int(ys.max()) - top + self.size)
+        return rect.clip(self.screen.get_rect())
@@ -1,18 +1,72 @@
-from random import randint
+from random import Random, randrange
 
 
 class Settings:
     """ A class to store all settings for Alien Invasion """
 
-    def __init__(self):
+    def __init__(self, seed=None):
         """ Initialize the game's static settings """
+        # All randomness comes from one seeded generator so runs can be replayed
+        self.seed = randrange(2 ** 32) if seed is None else seed
+        self.rng = Random(self.seed)
+
         # Screen settings
         self.screen_width = 1200  # Ширина экрана
         self.screen_height = 800  # Высота экрана
         self.bg_color = (0, 0, 255)  # Цвет фона
+        # Fullscreen uses the display resolution instead of the sizes above
+        self.fullscreen = True
+        # Redraw and push only the changed parts of the screen
+        self.dirty_rendering = False
+        # Logical resolution the game is played and drawn at, scaled to fit
+        # the display. None plays at the resolution of the display
+        self.render_size = None
+        # Let SDL do the scaling where pygame supports it, instead of
+        # scaling an offscreen surface every frame
+        self.hardware_scaling = True
+        # Draw and show frames on a separate thread. SDL only supports this
+        # on some platforms, not on macOS
+        self.threaded_rendering = False
+
+        # Game loop settings
+        self.target_fps = 60  # 0 means no frame limit
+        self.tick_rate = 120  # Simulation ticks per second
+        self.max_ticks_per_frame = 5
+        # Run exactly one tick per frame regardless of real time
+        self.lockstep = False
+
+        # Profiler settings, F3 toggles the profiler and F4 dumps its samples
+        self.profiling = False
+        self.profiler_window = 300  # Frames used for the rolling percentiles
+        self.profiler_max_samples = 100000  # Frames kept for dumping
+        self.profile_path = 'profile.csv'
+        # Print how long starting the game took
+        self.report_startup = False
+        # Measure how long input takes from being polled to the display
+        self.latency_tracking = False
+        self.latency_max_samples = 100000  # Inputs kept for the report
+
+        # Lower optional detail when frames take longer than at this frame rate
+        self.adaptive_quality = True
+        self.quality_target_fps = 60
+        self.quality_window = 60  # Frames averaged for each decision
+
+        # Best scores are kept in this file, None keeps them in memory only
+        self.leaderboard_path = 'leaderboard.data'
+        self.leaderboard_size = 10
+
+        # F5 quick-saves the game to memory and this file, F9 loads it back
+        self.quicksave_path = 'quicksave.data'
+        # Backspace steps back through snapshots of the last seconds of play
+        self.rewind_seconds = 10
+        self.rewind_interval = 0.5  # Seconds between snapshots
+
+        # Test collisions on the opaque pixels of the sprites, not just their rects
+        self.pixel_collisions = True
 
         # Ship settings
         self.ship_limit = 3
+        self.respawn_pause = 1.0  # Seconds the game stands still after a hit
 
         # Bullet settings
         self.bullet_width = 3
@@ -22,9 +76,33 @@ class Settings:
 
         # Alien settings
         self.fleet_drop_speed = 10
+        self.level_pause = 0.5  # Seconds between clearing a fleet and the next level
+
+        # Explosion settings
+        self.particle_capacity = 8192  # Particles that can be alive at once
+        self.particles_per_alien = 24
+        self.particle_speed = 150.0  # Top speed in pixels per second
+        self.particle_lifetime = 0.6  # Longest lifetime in seconds
+        self.particle_size = 3
+        self.particle_color = (255, 200, 50)
+
+        # Stress mode makes every level heavier, up to these caps, to see how
+        # the game copes with thousands of aliens and bullets. It never ends,
+        # a hit costs no ship, and speeds stop growing after a few levels so
+        # the load can be held for as long as it is measured
+        self.stress_mode = False
+        self.stress_speed_levels = 5  # Levels that still speed the game up
+        self.stress_density_step = 0.25  # See game.layout.pitch
+        self.stress_max_density = 2.0
+        self.stress_rows_step = 1
+        self.stress_max_extra_rows = 10
+        self.stress_levels_per_fleet = 2  # Levels until another fleet joins
+        self.stress_max_fleets = 4
+        self.stress_bullets_step = 10
+        self.stress_max_extra_bullets = 500
 
         # Star settings
-        self.star_count = randint(15, 25)
+        self.star_count = self.rng.randint(15, 25)
 
         # How quickly the game speeds up
         self.speedup_scale = 1.1
@@ -36,9 +114,10 @@ class Settings:
 
     def initialize_dynamic_settings(self):
         """ Initialize settings that change throughout the game """
-        self.ship_speed = 1.5
-        self.bullet_speed = 3.0
-        self.alien_speed = 1.0
+        # Speeds are in pixels per second
+        self.ship_speed = 300.0
+        self.bullet_speed = 600.0
+        self.alien_speed = 200.0
 
         # Scoring
         self.alien_points = 50
@@ -46,18 +125,46 @@ class Settings:
         # fleet direction of 1 represents right; -1 represents left
         self.fleet_direction = 1
 
+        # Levels of stress played so far, see apply_stress()
+        self.stress_level = 0
+        self.apply_stress()
+
     def increase_speed(self):
         """ Increase speed settings and alien point values """
-        self.ship_speed *= self.speedup_scale
-        self.bullet_speed *= self.speedup_scale
-        self.alien_speed *= self.speedup_scale
+        if not self.stress_mode or self.stress_level < self.stress_speed_levels:
+            self.ship_speed *= self.speedup_scale
+            self.bullet_speed *= self.speedup_scale
+            self.alien_speed *= self.speedup_scale
 
         self.alien_points = int(self.alien_points * self.score_scale)
 
+        if self.stress_mode:
+            self.stress_level += 1
+            self.apply_stress()
+
+    def apply_stress(self):
+        """ Set the fleet size and extra bullets of the current stress level """
+        self.fleet_density, self.extra_rows, self.fleet_count, self.extra_bullets = \
+            self.stress_values(self.stress_level)
+
+    def stress_values(self, level):
+        """ Return the fleet density, extra rows, fleet count and extra bullets of a stress level """
+        return (min(1.0 + self.stress_density_step * level, self.stress_max_density),
+                min(self.stress_rows_step * level, self.stress_max_extra_rows),
+                min(1 + level // self.stress_levels_per_fleet, self.stress_max_fleets),
+                min(self.stress_bullets_step * level, self.stress_max_extra_bullets))
+
     def set_start_speed(self):
         """ Set starting speed of the game """
-        self.ship_speed *= self.speedup_scale ** (self.manual_level - 1)
-        self.bullet_speed *= self.speedup_scale ** (self.manual_level - 1)
-        self.alien_speed *= self.speedup_scale ** (self.manual_level - 1)
+        speedups = self.manual_level - 1
+        if self.stress_mode:
+            speedups = min(speedups, self.stress_speed_levels)
+        self.ship_speed *= self.speedup_scale ** speedups
+        self.bullet_speed *= self.speedup_scale ** speedups
+        self.alien_speed *= self.speedup_scale ** speedups
 
         self.alien_points *= int(self.speedup_scale ** (self.manual_level - 1))
+
+        if self.stress_mode:
+            self.stress_level = self.manual_level - 1
+            self.apply_stress()
@@ -1,6 +1,7 @@
-import pygame
 from pygame.sprite import Sprite
 
+from game import assets
+
 
 class Ship(Sprite):
     """ A class to manage the ship"""
@@ -13,8 +14,9 @@ class Ship(Sprite):
         self.screen_rect = ai_game.screen.get_rect()
 
         # Load the ship image and get its rect
-        self.image = pygame.image.load('images/ship1.png')
+        self.image = assets.get_image('ship')
         self.rect = self.image.get_rect()
+        self.mask = assets.get_mask('ship')
 
         # Start each new ship at the bottom center of the screen
         self.rect.midbottom = self.screen_rect.midbottom
@@ -23,26 +25,33 @@ class Ship(Sprite):
         # Because of the thing that rect can store only integers, to control the position of our ship more accurate,
         # we need to create self.x value
         self.x = float(self.rect.x)
+        # Position at the previous simulation tick, used to interpolate drawing
+        self.prev_x = self.x
 
         # Movement flags
         self.moving_right = False
         self.moving_left = False
 
-    def blit_me(self):
-        """ Draw the ship at its current location"""
-        self.screen.blit(self.image, self.rect)
+    def blit_me(self, alpha=1.0):
+        """ Draw the ship between its previous and current location """
+        rect = self.rect.copy()
+        rect.x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        return self.screen.blit(self.image, rect)
 
-    def update(self):
+    def update(self, dt):
         """ Update the ship's position based on the movement flags """
+        self.prev_x = self.x
+
         # Update the ship's x value, not the rect
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         # Update rect object from self.x
-        self.rect.x = self.x
+        self.rect.x = int(self.x)
 
     def center_ship(self):
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.prev_x = self.x
@@ -0,0 +1,193 @@
+""" The rules of Alien Invasion as plain data, without pygame
+
+The simulation follows the same rules as AlienInvasion: the fleet moves
+rigidly and drops at the screen edges, each bullet scores for every alien it
+overlaps, and clearing the fleet starts a faster level. Pauses after a hit
+or a cleared level are skipped, as they do not change the outcome.
+Collisions are tested on sprite rects, as in the game with pixel
+collisions turned off, since pixel masks need pygame. Stress mode is not
+modelled. The sprite sizes are read from the index of the sprite atlas the
+game draws from, and tests/test_simulation.py checks the simulation
+against the game tick for tick.
+"""
+from game.atlas_index import sprite_size
+from game.layout import fleet_layout
+from game.settings import Settings
+
+
+class Simulation:
+    """ A game of Alien Invasion advanced one tick at a time by step() """
+
+    def __init__(self, settings=None, alien_size=None, ship_size=None):
+        """ Start a new game on a screen of the size in the settings
+
+        The sprite sizes default to those of the sprites in the atlas.
+        """
+        self.settings = settings or Settings(seed=0)
+        self.alien_width, self.alien_height = alien_size or sprite_size('alien')
+        self.ship_width, self.ship_height = ship_size or sprite_size('ship')
+        self.dt = 1.0 / self.settings.tick_rate
+        self.reset()
+
+    def reset(self):
+        """ Reset the statistics and settings and start the first level """
+        settings = self.settings
+        settings.initialize_dynamic_settings()
+        settings.set_start_speed()
+
+        self.ships_left = settings.ship_limit
+        self.score = 0
+        self.level = max(settings.manual_level, 1)
+        self.game_over = False
+        self.ticks = 0
+
+        self.ship_top = settings.screen_height - self.ship_height
+        self._new_fleet()
+        self._center_ship()
+
+    def step(self, move=0, fire=False):
+        """ Advance the game by one tick
+
+        move is -1 to move the ship left, 1 to move it right and 0 to stay.
+        """
+        if self.game_over:
+            return
+        self.ticks += 1
+        if fire:
+            self.fire_bullet()
+        self._update_ship(move)
+        self._update_bullets()
+        if self.alive_count:
+            self._update_fleet()
+        else:
+            self._start_new_level()
+
+    def fire_bullet(self):
+        """ Fire a bullet from the top of the ship if one is allowed """
+        if len(self.bullets) < self.settings.bullets_allowed:
+            x = int(self.ship_x) + self.ship_width // 2 - self.settings.bullet_width // 2
+            self.bullets.append([x, float(self.ship_top)])
+
+    def living_aliens(self):
+        """ Return the current positions of the living aliens """
+        offset_x, offset_y = self.offset_x, self.offset_y
+        return [(int(x + offset_x), y + offset_y)
+                for x, y, alive in zip(self.alien_x, self.alien_y, self.alive) if alive]
+
+    def _new_fleet(self):
+        """ Replace the fleet by a full one and clear the bullets """
+        settings = self.settings
+        self.alien_x, self.alien_y = fleet_layout(
+            settings.screen_width, settings.screen_height,
+            (self.alien_width, self.alien_height), self.ship_height)
+        self.alive = [True] * len(self.alien_x)
+        self.alive_count = len(self.alive)
+        self.offset_x = 0.0
+        self.offset_y = 0
+        self._update_bounds()
+        self.bullets = []
+
+    def _center_ship(self):
+        self.ship_x = float(self.settings.screen_width // 2 - self.ship_width // 2)
+
+    def _update_bounds(self):
+        """ Find the bounding box of the living aliens at zero offset """
+        living = [i for i, alive in enumerate(self.alive) if alive]
+        if living:
+            self.left = min(self.alien_x[i] for i in living)
+            self.right = max(self.alien_x[i] for i in living)
+            self.bottom = max(self.alien_y[i] for i in living) + self.alien_height
+        else:
+            self.left = self.right = self.bottom = 0
+
+    def _update_ship(self, move):
+        x = int(self.ship_x)
+        if move > 0 and x + self.ship_width < self.settings.screen_width:
+            self.ship_x += self.settings.ship_speed * self.dt
+        if move < 0 and x > 0:
+            self.ship_x -= self.settings.ship_speed * self.dt
+
+    def _update_bullets(self):
+        settings = self.settings
+        distance = settings.bullet_speed * self.dt
+        for bullet in self.bullets:
+            bullet[1] -= distance
+        # Bullets leave the screen in the order they were fired
+        while self.bullets and int(self.bullets[0][1]) + settings.bullet_height <= 0:
+            self.bullets.pop(0)
+
+        hit_any = False
+        for bullet in list(self.bullets):
+            hits = self._aliens_hit(bullet[0], int(bullet[1]), settings.bullet_width, settings.bullet_height)
+            if hits:
+                hit_any = True
+                self.bullets.remove(bullet)
+                for index in hits:
+                    self.alive[index] = False
+                self.alive_count -= len(hits)
+                self.score += settings.alien_points * len(hits)
+        if hit_any:
+            self._update_bounds()
+
+    def _start_new_level(self):
+        self._new_fleet()
+        self.settings.increase_speed()
+        self.level += 1
+
+    def _aliens_hit(self, left, top, width, height):
+        """ Return the indices of the living aliens overlapping the rect """
+        offset_x, offset_y = self.offset_x, self.offset_y
+        right, bottom = left + width, top + height
+        hits = []
+        for index, alive in enumerate(self.alive):
+            if alive:
+                x = int(self.alien_x[index] + offset_x)
+                y = self.alien_y[index] + offset_y
+                if x < right and x + self.alien_width > left and y < bottom and y + self.alien_height > top:
+                    hits.append(index)
+        return hits
+
+    def _update_fleet(self):
+        settings = self.settings
+        left = int(self.left + self.offset_x)
+        right = int(self.right + self.offset_x) + self.alien_width
+        if right >= settings.screen_width or left <= 0:
+            self.offset_y += settings.fleet_drop_speed
+            settings.fleet_direction *= -1
+        self.offset_x += settings.alien_speed * settings.fleet_direction * self.dt
+
+        # Only test the ship against single aliens once the fleet is low enough
+        fleet_bottom = self.bottom + self.offset_y
+        if fleet_bottom > self.ship_top and self._aliens_hit(
+                int(self.ship_x), self.ship_top, self.ship_width, self.ship_height):
+            self._ship_hit()
+        elif fleet_bottom >= settings.screen_height:
+            self._ship_hit()
+
+    def _ship_hit(self):
+        if self.ships_left > 0:
+            self.ships_left -= 1
+            self._new_fleet()
+            self._center_ship()
+        else:
+            self.game_over = True
+
+
+def bot_policy(simulation, rng=None, mistake_rate=0.2):
+    """ Move under the lowest alien closest to the ship and keep firing
+
+    With a random generator the bot sometimes holds still when it should
+    move, so games with different seeds play out differently.
+    """
+    aliens = simulation.living_aliens()
+    if not aliens:
+        return 0, False
+    lowest = max(y for _, y in aliens)
+    ship_center = simulation.ship_x + simulation.ship_width / 2
+    target = min((x + simulation.alien_width / 2 for x, y in aliens if y == lowest),
+                 key=lambda center: abs(center - ship_center))
+    distance = target - ship_center
+    move = 0 if abs(distance) < simulation.alien_width / 4 else (1 if distance > 0 else -1)
+    if rng is not None and rng.random() < mistake_rate:
+        move = 0
+    return move, abs(distance) < simulation.alien_width / 2
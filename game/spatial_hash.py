@@ -0,0 +1,41 @@
+class SpatialHash:
+    """ A column grid that buckets aliens by their horizontal position
+
+    Positions are stored in fleet coordinates, so the grid stays valid while
+    the whole fleet moves and only needs updating when an alien is removed.
+    """
+
+    def __init__(self, cell_width):
+        """ Initialize an empty grid with columns of the given width """
+        self.cell_width = max(1, int(cell_width))
+        self.buckets = {}
+
+    def _columns(self, left, right):
+        """ Return the range of columns covering the span [left, right) """
+        return range(int(left // self.cell_width), int((right - 1) // self.cell_width) + 1)
+
+    def insert(self, index, left, width):
+        """ Add an item spanning width pixels from left """
+        for column in self._columns(left, left + width):
+            self.buckets.setdefault(column, []).append(index)
+
+    def remove(self, index, left, width):
+        """ Remove a previously inserted item """
+        for column in self._columns(left, left + width):
+            bucket = self.buckets.get(column)
+            if bucket is not None:
+                bucket.remove(index)
+                if not bucket:
+                    del self.buckets[column]
+
+    def copy(self):
+        """ Return an independent grid with the same items """
+        grid = SpatialHash(self.cell_width)
+        grid.buckets = {column: list(bucket) for column, bucket in self.buckets.items()}
+        return grid
+
+    def query(self, left, right):
+        """ Return the indices of the items that may overlap the span [left, right) """
+        # An item spanning several columns is found once, in the order found
+        return list(dict.fromkeys(index for column in self._columns(left, right)
+                                  for index in self.buckets.get(column, ())))
@@ -1,11 +1,12 @@
-import pygame
 from pygame.sprite import Sprite
 
+from game import assets
+
 
 class Star(Sprite):
     def __init__(self, ai_game):
         super().__init__()
         self.screen = ai_game.screen
 
-        self.image = pygame.image.load('images/star.png')
+        self.image = assets.get_image('star')
         self.rect = self.image.get_rect()
@@ -0,0 +1,71 @@
+""" Run many simulated games of Alien Invasion in parallel
+
+Plays games with a simple bot on the pygame-free simulation core, spread
+over all cores, and reports scores for every combination of speed-up and
+score scales.
+
+    python simulate.py --games 1000 --speedup-scales 1.05 1.1 1.2 --score-scales 1.5 2
+"""
+import argparse
+import itertools
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from game.settings import Settings
+from game.simulation import Simulation, bot_policy
+
+
+def play_game(job):
+    """ Play one game with the bot and return its results """
+    speedup_scale, score_scale, seed, args = job
+    settings = Settings(seed=seed)
+    settings.screen_width = args.width
+    settings.screen_height = args.height
+    settings.bullets_allowed = args.bullets
+    settings.speedup_scale = speedup_scale
+    settings.score_scale = score_scale
+
+    simulation = Simulation(settings)
+    while not simulation.game_over and simulation.ticks < args.max_ticks:
+        simulation.step(*bot_policy(simulation, settings.rng))
+    return speedup_scale, score_scale, simulation.score, simulation.level, simulation.ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=100, help='games per combination of scales')
+    parser.add_argument('--speedup-scales', nargs='+', type=float, default=[Settings().speedup_scale])
+    parser.add_argument('--score-scales', nargs='+', type=float, default=[Settings().score_scale])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--bullets', type=int, default=Settings().bullets_allowed)
+    parser.add_argument('--max-ticks', type=int, default=120 * 60 * 10, help='ticks before a game is stopped')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    jobs = [(speedup_scale, score_scale, seed, args)
+            for speedup_scale, score_scale in itertools.product(args.speedup_scales, args.score_scales)
+            for seed in range(args.games)]
+
+    start = perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        chunksize = max(1, len(jobs) // (args.workers * 4))
+        for speedup_scale, score_scale, score, level, ticks in executor.map(play_game, jobs, chunksize=chunksize):
+            results.setdefault((speedup_scale, score_scale), []).append((score, level, ticks))
+    elapsed = perf_counter() - start
+
+    print('{} games in {:.1f} s on {} workers'.format(len(jobs), elapsed, args.workers))
+    print('{:>8} {:>8} {:>12} {:>12} {:>8} {:>10}'.format(
+        'speedup', 'score', 'mean score', 'median', 'level', 'ticks'))
+    for (speedup_scale, score_scale), games in sorted(results.items()):
+        scores = [score for score, _, _ in games]
+        print('{:>8} {:>8} {:>12.0f} {:>12.0f} {:>8.1f} {:>10.0f}'.format(
+            speedup_scale, score_scale, statistics.mean(scores), statistics.median(scores),
+            statistics.mean(level for _, level, _ in games), statistics.mean(ticks for _, _, ticks in games)))
+
+
+if __name__ == '__main__':
+    main()
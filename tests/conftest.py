@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+# The game runs without a window, and has to be importable and find its
+# images from the repository root
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+
+from game.settings import Settings
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    """ Run every test from the repository root """
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def make_settings():
+    """ Return a function making settings for a small window that runs unthrottled
+
+    Keyword arguments change settings on top of those.
+    """
+    def make_settings(seed=0, **changes):
+        settings = Settings(seed=seed)
+        settings.fullscreen = False
+        settings.screen_width = 800
+        settings.screen_height = 600
+        settings.target_fps = 0
+        settings.adaptive_quality = False
+        # Tests neither read nor write the files of real play
+        settings.leaderboard_path = None
+        settings.quicksave_path = None
+        for name, value in changes.items():
+            setattr(settings, name, value)
+        return settings
+    return make_settings
+
+
+@pytest.fixture
+def key_press():
+    """ Return a function giving the events of pressing a key """
+    def key_press(key):
+        return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=''),
+                pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode='')]
+    return key_press
+
+
+@pytest.fixture
+def scenario_fire(key_press):
+    """ Return the events of a frame of starting a game, sweeping the ship and firing """
+    def scenario_fire(frame):
+        events = []
+        if frame == 0:
+            events += key_press(pygame.K_p)
+        if frame % 240 == 0:
+            events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_LEFT, mod=0, unicode=''))
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT, mod=0, unicode=''))
+        elif frame % 240 == 120:
+            events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_RIGHT, mod=0, unicode=''))
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_LEFT, mod=0, unicode=''))
+        if frame % 5 == 0:
+            events += key_press(pygame.K_SPACE)
+        return events
+    return scenario_fire
+
+
+@pytest.fixture
+def play(scenario_fire):
+    """ Return a function running frames of the fire scenario, with extra events on some frames """
+    def play(ai_game, frames, start=0, extra_events=None):
+        for frame in range(start, start + frames):
+            for event in scenario_fire(frame) + (extra_events or {}).get(frame, []):
+                pygame.event.post(event)
+            ai_game._run_frame()
+    return play
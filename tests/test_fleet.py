@@ -0,0 +1,37 @@
+import pygame
+
+from alien_invasion import AlienInvasion
+
+
+def test_template_cache_is_bounded(make_settings):
+    ai_game = AlienInvasion(make_settings())
+    fleet = ai_game.fleet
+    layouts = [ai_game.fleet_layout(1.0 + 0.25 * step, step) for step in range(fleet.MAX_TEMPLATES + 2)]
+    for xs, ys in layouts:
+        fleet.build(xs, ys)
+        fleet.remove([0, 1])
+    assert len(fleet._templates) == fleet.MAX_TEMPLATES
+
+    # An evicted layout is set up again from scratch
+    fleet.build(*layouts[0])
+    image = fleet.formation.surface
+    fresh = AlienInvasion(make_settings()).fleet
+    fresh.build(*layouts[0])
+    assert len(fleet) == len(layouts[0][0])
+    assert pygame.image.tostring(image, 'RGBA') == pygame.image.tostring(fresh.formation.surface, 'RGBA')
+
+
+def test_hits_match_every_alien(make_settings):
+    """ The grid lookup finds the same aliens as testing every one of them """
+    ai_game = AlienInvasion(make_settings())
+    fleet = ai_game.fleet
+    fleet.remove(list(range(0, len(fleet.alive), 3)))
+    fleet.offset_x, fleet.offset_y = 17.6, 40
+    screen = ai_game.screen.get_rect()
+    for x in range(0, screen.width, 7):
+        for y in range(0, screen.height, 11):
+            rect = pygame.Rect(x, y, 5, 15)
+            expected = [index for index, (ax, ay) in enumerate(zip(*fleet.positions()))
+                        if fleet.alive[index] and
+                        rect.colliderect(pygame.Rect(int(ax), int(ay), fleet.alien_width, fleet.alien_height))]
+            assert sorted(fleet.hits(rect)) == expected
@@ -0,0 +1,38 @@
+import pygame
+
+from game.formation import Formation
+
+
+def make_formation():
+    image = pygame.Surface((10, 8), pygame.SRCALPHA)
+    image.fill((255, 0, 0, 255))
+    return Formation(image, (0, 20, 40), (0, 0, 0))
+
+
+def test_copy_on_write_keeps_drawn_surface():
+    formation = make_formation()
+    formation.copy_on_write = True
+    screen = pygame.Surface((100, 100))
+
+    formation.draw(screen, 0, 0)
+    drawn = formation.surface
+    before = pygame.image.tostring(drawn, 'RGBA')
+    formation.erase(20, 0)
+    assert pygame.image.tostring(drawn, 'RGBA') == before
+    assert formation.surface is not drawn
+    assert formation.surface.get_at((25, 4)).a == 0
+
+    # Changes before the next draw go to the same copy
+    copy = formation.surface
+    formation.erase(40, 0)
+    assert formation.surface is copy
+
+
+def test_restore_after_copy_matches_pristine():
+    pristine = make_formation()
+    formation = pristine.copy()
+    formation.copy_on_write = True
+    formation.erase(0, 0)
+    formation.draw(pygame.Surface((100, 100)), 0, 0)
+    formation.restore(pristine)
+    assert pygame.image.tostring(formation.surface, 'RGBA') == pygame.image.tostring(pristine.surface, 'RGBA')
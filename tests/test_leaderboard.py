@@ -0,0 +1,26 @@
+import pytest
+
+from utils.leaderboard import Leaderboard
+
+
+def test_failed_save_keeps_worker_alive(tmp_path):
+    # A file in place of the directory makes every save fail
+    (tmp_path / 'blocked').write_text('')
+    leaderboard = Leaderboard(str(tmp_path / 'blocked' / 'leaderboard.data'), 10)
+    leaderboard.add(100, 1)
+    leaderboard._jobs.join()
+
+    path = str(tmp_path / 'leaderboard.data')
+    leaderboard.path = path
+    leaderboard.add(200, 2)
+    leaderboard.close()
+    assert not leaderboard._thread.is_alive()
+
+    reloaded = Leaderboard(path, 10)
+    reloaded.close()
+    assert [entry[0] for entry in reloaded.entries] == [200, 100]
+
+
+def test_size_must_fit_header():
+    with pytest.raises(ValueError):
+        Leaderboard(None, 256)
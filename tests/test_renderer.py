@@ -0,0 +1,22 @@
+import pygame
+
+from utils.renderer import Renderer
+
+
+def test_scaled_screen_keeps_aspect_ratio():
+    pygame.display.init()
+    display = pygame.display.set_mode((1000, 500))
+    screen = pygame.Surface((400, 300))
+    screen.fill((255, 255, 255))
+    renderer = Renderer(screen, screen.copy(), display)
+    renderer.end_frame()
+
+    # A 4:3 screen on a 2:1 display is scaled by 5/3 with bars on the sides
+    assert display.get_at((165, 250))[:3] == (0, 0, 0)
+    assert display.get_at((170, 250))[:3] == (255, 255, 255)
+    assert display.get_at((829, 250))[:3] == (255, 255, 255)
+    assert display.get_at((835, 250))[:3] == (0, 0, 0)
+    # Clicks map back from the same area, the bars are off the screen
+    assert renderer.to_screen((167, 0)) == (0, 0)
+    assert renderer.to_screen((833, 499)) == (399, 299)
+    assert renderer.to_screen((100, 250))[0] < 0
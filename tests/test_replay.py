@@ -0,0 +1,28 @@
+import pygame
+
+from alien_invasion import AlienInvasion
+from utils.replay import InputPlayer, InputRecorder
+from utils.snapshot import take_snapshot
+
+
+def test_replay_uses_recorded_rules(tmp_path, make_settings, key_press, play):
+    path = str(tmp_path / 'session.airl')
+    settings = make_settings(seed=3, lockstep=True, stress_mode=True, bullets_allowed=7, pixel_collisions=False)
+    ai_game = AlienInvasion(settings)
+    ai_game.input = InputRecorder(ai_game.input, path, settings)
+    # Start a few levels up, where stress mode changes the fleet
+    play(ai_game, 600, extra_events={0: key_press(pygame.K_PAGEUP) * 3})
+    ai_game.input.close()
+
+    player = InputPlayer(path)
+    settings = make_settings(seed=player.seed)
+    settings.quicksave_path = str(tmp_path / 'quicksave.data')
+    player.configure(settings)
+    assert (settings.stress_mode, settings.bullets_allowed, settings.pixel_collisions) == (True, 7, False)
+    assert settings.quicksave_path is None
+
+    replay = AlienInvasion(settings)
+    replay.input = player
+    while not player.finished:
+        replay._run_frame()
+    assert take_snapshot(replay) == take_snapshot(ai_game)
@@ -0,0 +1,19 @@
+from alien_invasion import AlienInvasion
+
+
+def test_high_score_renders_on_score_interval(make_settings):
+    ai_game = AlienInvasion(make_settings())
+    sb = ai_game.sb
+    sb.set_quality(4, sb.atlas.antialias)
+    image = sb.high_score_image
+
+    ai_game.stats.score = ai_game.stats.high_score + 1000
+    sb.check_high_score()
+    assert sb.high_score_image is image
+
+    # The new high score shows with the next re-render of the score
+    while (sb._frames + 1) % sb.score_interval:
+        sb.update()
+        assert sb.high_score_image is image
+    sb.update()
+    assert sb.high_score_image is not image
@@ -0,0 +1,41 @@
+from alien_invasion import AlienInvasion
+from game import assets
+from game.simulation import Simulation, bot_policy
+
+
+# The simulation tests collisions on rects
+SETTINGS = dict(seed=1, lockstep=True, pixel_collisions=False)
+
+
+def test_sprite_sizes_match_game(make_settings):
+    simulation = Simulation(make_settings(**SETTINGS))
+    AlienInvasion(make_settings(**SETTINGS))
+    assert (simulation.alien_width, simulation.alien_height) == assets.get_image('alien').get_size()
+    assert (simulation.ship_width, simulation.ship_height) == assets.get_image('ship').get_size()
+
+
+def test_simulation_matches_game(make_settings):
+    """ The bot plays the simulation and the game alike, tick for tick """
+    simulation = Simulation(make_settings(**SETTINGS))
+    ai_game = AlienInvasion(make_settings(**SETTINGS))
+    ai_game._start_game()
+
+    for tick in range(12000):
+        move, fire = bot_policy(simulation)
+        simulation.step(move, fire)
+
+        if fire:
+            ai_game._fire_bullet()
+        ai_game.ship.moving_right = move > 0
+        ai_game.ship.moving_left = move < 0
+        ai_game._update_simulation(ai_game.loop.dt)
+        # The simulation skips the pauses after a hit or a cleared level
+        if not ai_game.state.playing and ai_game.state.on_expire:
+            ai_game.state.update(ai_game.state.timer)
+
+        assert (simulation.score, simulation.level, simulation.ships_left, simulation.ship_x) == \
+            (ai_game.stats.score, ai_game.stats.level, ai_game.stats.ships_left, ai_game.ship.x), tick
+        if simulation.game_over:
+            break
+    # Long enough to play through a few levels
+    assert simulation.level > 2
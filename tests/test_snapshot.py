@@ -0,0 +1,69 @@
+import struct
+import time
+
+import pygame
+import pytest
+
+from alien_invasion import AlienInvasion
+from utils.replay import InputPlayer, InputRecorder
+from utils.snapshot import BULLETS, FLEET, FLEETS, GAME, HEADER, restore_snapshot, take_snapshot
+
+
+def test_snapshot_round_trip(make_settings, play):
+    ai_game = AlienInvasion(make_settings(lockstep=True))
+    play(ai_game, 400)
+    data = take_snapshot(ai_game)
+
+    other = AlienInvasion(make_settings())
+    restore_snapshot(other, data)
+    assert take_snapshot(other) == data
+
+
+def test_rewind_replays_exactly(tmp_path, make_settings, key_press, play):
+    """ A session rewound in real time rewinds to the same state on replay """
+    path = str(tmp_path / 'session.airl')
+    settings = make_settings(seed=7)
+    ai_game = AlienInvasion(settings)
+    ai_game.input = InputRecorder(ai_game.input, path, settings)
+
+    # Uneven frame times give frames of zero to several ticks
+    rewinds = {150: key_press(pygame.K_BACKSPACE), 250: key_press(pygame.K_BACKSPACE)}
+    for frame in range(320):
+        time.sleep((0.0, 0.004, 0.013, 0.021)[frame % 4])
+        play(ai_game, 1, frame, rewinds)
+    # The rewinds went back in time
+    assert ai_game.loop.tick_count < ai_game.loop.ticks_run
+    live = take_snapshot(ai_game)
+    ticks_run = ai_game.loop.ticks_run
+    ai_game.input.close()
+
+    player = InputPlayer(path)
+    settings = make_settings(seed=player.seed)
+    player.configure(settings)
+    replay = AlienInvasion(settings)
+    replay.input = player
+    while not player.finished or replay.loop.ticks_run < ticks_run:
+        replay._run_frame()
+
+    assert replay.loop.ticks_run == ticks_run
+    assert take_snapshot(replay) == live
+
+
+def test_broken_snapshot_leaves_game_unchanged(make_settings, play):
+    ai_game = AlienInvasion(make_settings(lockstep=True))
+    play(ai_game, 400)
+    data = bytearray(take_snapshot(ai_game))
+
+    other = AlienInvasion(make_settings())
+    play(other, 100)
+    before = take_snapshot(other)
+
+    # Claim a different number of aliens for the first fleet
+    bullets, = BULLETS.unpack_from(data, HEADER.size + GAME.size)
+    fleet = HEADER.size + GAME.size + BULLETS.size + 20 * bullets + FLEETS.size
+    aliens = FLEET.unpack_from(data, fleet)[-1]
+    struct.pack_into('<I', data, fleet + FLEET.size - 4, aliens - 1)
+
+    with pytest.raises(ValueError):
+        restore_snapshot(other, bytes(data))
+    assert take_snapshot(other) == before
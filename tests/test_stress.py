@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from alien_invasion import AlienInvasion
+from utils.game_state import GameState
+
+
+def run_until(ai_game, done, frames=1000):
+    """ Run frames until done() is true """
+    for _ in range(frames):
+        ai_game._run_frame()
+        if done():
+            return
+    raise AssertionError('gave up after {} frames'.format(frames))
+
+
+def test_stress_mode_outlasts_hits(make_settings):
+    """ Hits cost no ship in stress mode, the fleets come back up and the levels go on """
+    settings = make_settings(stress_mode=True, lockstep=True)
+    ai_game = AlienInvasion(settings)
+    ai_game._start_game()
+    start_speed = settings.alien_speed
+
+    for level in range(2, 10):
+        # Land the fleets on the ship more often than it has ships
+        for _ in range(settings.ship_limit + 1):
+            survivors = [fleet.alive.copy() for fleet in ai_game.fleets]
+            ai_game.fleet.offset_y = settings.screen_height
+            run_until(ai_game, lambda: ai_game.state.state == GameState.RESPAWNING)
+            run_until(ai_game, lambda: ai_game.state.playing)
+            assert ai_game.stats.game_active
+            assert ai_game.stats.ships_left == settings.ship_limit
+            for fleet, alive in zip(ai_game.fleets, survivors):
+                assert np.array_equal(fleet.alive, alive)
+
+        # Clear the fleets to reach the next level
+        for fleet in ai_game.fleets:
+            fleet.remove(np.flatnonzero(fleet.alive).tolist())
+        run_until(ai_game, lambda: ai_game.stats.level == level)
+
+    assert settings.stress_level == 8
+    assert settings.alien_speed == pytest.approx(start_speed * settings.speedup_scale ** settings.stress_speed_levels)
@@ -1,4 +1,6 @@
-import pygame.font
+import pygame
+
+from utils.fonts import get_font
 
 
 class Button:
@@ -11,7 +13,7 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = get_font(None, 48)
 
         # Built the button's rect object and center it
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -30,3 +32,4 @@ class Button:
         # Draw blank button and then draw message
         self.screen.fill(self.button_color, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
+        return self.rect
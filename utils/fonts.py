@@ -0,0 +1,18 @@
+import pygame.font
+
+
+_fonts = {}
+
+
+def get_font(name=None, size=48):
+    """ Return a shared font, resolving it only the first time it is asked for """
+    font = _fonts.get((name, size))
+    if font is None:
+        if name is None:
+            # The default font is bundled with pygame, so the system fonts
+            # never need to be scanned for it
+            font = pygame.font.Font(None, size)
+        else:
+            font = pygame.font.SysFont(name, size)
+        _fonts[(name, size)] = font
+    return font
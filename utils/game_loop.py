@@ -0,0 +1,67 @@
+from time import perf_counter
+
+import pygame
+
+
+class GameLoop:
+    """ Schedule fixed-length simulation ticks and limit the frame rate
+
+    Real time is collected in an accumulator and spent in ticks of the same
+    length, so the game plays at the same speed at any frame rate. The part
+    of a tick left over is exposed as alpha to interpolate drawing between
+    the previous and the current simulation state.
+    """
+
+    def __init__(self, settings):
+        """ Initialize the loop timing from the settings """
+        self.settings = settings
+        self.clock = pygame.time.Clock()
+
+        # Length of one simulation tick in seconds
+        self.dt = 1.0 / settings.tick_rate
+
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        # Tick of the game, set back when a snapshot is loaded
+        self.tick_count = 0
+        # Ticks run since the start, never set back, input logs are timed by it
+        self.ticks_run = 0
+        self._last_time = perf_counter()
+
+        # Time the last frame spent working, without waiting for the limiter
+        self.work_time = 0.0
+        self._frame_start = self._last_time
+
+    def ticks(self):
+        """ Return the number of simulation ticks to run in this frame """
+        if self.settings.lockstep:
+            self.alpha = 1.0
+            return 1
+
+        now = perf_counter()
+        self.accumulator += now - self._last_time
+        self._last_time = now
+
+        ticks = int(self.accumulator // self.dt)
+        if ticks > self.settings.max_ticks_per_frame:
+            # Too far behind, e.g. after a stall: drop the backlog instead of
+            # spending several frames catching up
+            ticks = self.settings.max_ticks_per_frame
+            self.accumulator = self.accumulator % self.dt
+        else:
+            self.accumulator -= ticks * self.dt
+
+        self.alpha = self.accumulator / self.dt
+        return ticks
+
+    def advance(self):
+        """ Count the start of a simulation tick """
+        self.tick_count += 1
+        self.ticks_run += 1
+
+    def end_frame(self):
+        """ Wait long enough to keep to the target frame rate """
+        self.work_time = perf_counter() - self._frame_start
+        if self.settings.target_fps:
+            self.clock.tick(self.settings.target_fps)
+        self._frame_start = perf_counter()
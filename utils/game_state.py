@@ -0,0 +1,40 @@
+class GameState:
+    """ Track what the game is doing and switch state when a timer runs out
+
+    Pauses such as respawning the ship are timed in simulation ticks, so the
+    main loop keeps handling input and drawing frames while they last.
+    """
+
+    PLAYING = 'playing'
+    RESPAWNING = 'respawning'
+    LEVEL_TRANSITION = 'level-transition'
+    GAME_OVER = 'game-over'
+
+    def __init__(self):
+        """ Start on the game over screen with the Play button """
+        self.set(self.GAME_OVER)
+
+    def set(self, state, duration=0.0, on_expire=None):
+        """ Switch to a state, calling on_expire after duration seconds """
+        self.state = state
+        self.timer = duration
+        self._on_expire = on_expire
+
+    def update(self, dt):
+        """ Advance the timer of the current state by dt seconds """
+        if self._on_expire is None:
+            return
+        self.timer -= dt
+        if self.timer <= 0:
+            on_expire, self._on_expire = self._on_expire, None
+            on_expire()
+
+    @property
+    def on_expire(self):
+        """ The function called when the timer runs out, or None """
+        return self._on_expire
+
+    @property
+    def playing(self):
+        """ True if the simulation should advance """
+        return self.state == self.PLAYING
@@ -0,0 +1,54 @@
+import pygame
+
+
+class GlyphAtlas:
+    """ Pre-rendered pieces of text composed into strings by blitting
+
+    Labels such as 'Score: ' are rendered whole to keep their kerning, and
+    anything else is put together from single characters.
+    """
+
+    CHARACTERS = '0123456789,.: -'
+
+    def __init__(self, font, color, labels=(), antialias=True):
+        """ Render the characters and labels once """
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.height = font.get_height()
+
+        self.glyphs = {}
+        for text in list(self.CHARACTERS) + list(labels):
+            self._glyph(text)
+
+    def _glyph(self, text):
+        """ Return the image of a piece of text, rendering it the first time """
+        glyph = self.glyphs.get(text)
+        if glyph is None:
+            glyph = self.font.render(text, self.antialias, self.color)
+            # Glyphs in the display's pixel format blit several times faster
+            if pygame.display.get_surface() is not None:
+                glyph = glyph.convert_alpha()
+            self.glyphs[text] = glyph
+        return glyph
+
+    def render(self, *pieces):
+        """ Return an image of the pieces of text side by side
+
+        Pieces that are labels of the atlas are drawn whole, other pieces
+        character by character.
+        """
+        images = []
+        for piece in pieces:
+            if piece in self.glyphs:
+                images.append(self.glyphs[piece])
+            else:
+                images.extend(self._glyph(character) for character in piece)
+
+        image = pygame.Surface((sum(glyph.get_width() for glyph in images), self.height), pygame.SRCALPHA)
+        x = 0
+        for glyph in images:
+            # Copying instead of blending keeps the glyph edges as rendered
+            image.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += glyph.get_width()
+        return image
@@ -0,0 +1,154 @@
+import csv
+import statistics
+import threading
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+
+# Upper edges in ms of the histogram buckets, the last bucket takes the rest
+BUCKETS = (2, 4, 8, 12, 17, 25, 33, 50, 67, 100)
+
+
+class InputLatency:
+    """ The way of one input event from being polled to the display """
+
+    __slots__ = ('name', 'polled', 'tick', 'simulated', 'frame', 'shown')
+
+    def __init__(self, name, polled):
+        self.name = name
+        self.polled = polled  # When the event was taken from the queue
+        self.tick = None  # Tick count after the first ticks that ran with it
+        self.simulated = None  # When those ticks were done
+        self.frame = None  # Number of the frame that first shows it
+        self.shown = None  # When that frame was flipped to the display
+
+    def stages(self):
+        """ Return the queue to simulation, simulation to display and total times in ms """
+        return ((self.simulated - self.polled) * 1000, (self.shown - self.simulated) * 1000,
+                (self.shown - self.polled) * 1000)
+
+
+class LatencyTracker:
+    """ Measure how long input takes to show up on the display
+
+    Every input event is timestamped when the game polls it, when the first
+    simulation ticks after it have run, and when the first frame drawn
+    after those ticks has been flipped. Time the event waited in the queue
+    of the operating system and the display's own delay are not included.
+
+    Frames are numbered in the order they are handed to the renderer, which
+    reports each number back once it has flipped that frame, possibly from
+    its own thread.
+    """
+
+    def __init__(self, settings):
+        """ Initialize the tracker, disabled unless the settings enable it """
+        self.enabled = settings.latency_tracking
+        self.records = deque(maxlen=settings.latency_max_samples)
+        self.frames = 0
+
+        self._polled = []
+        self._simulated = []
+        # Inputs of frames handed to the renderer but not flipped yet
+        self._lock = threading.Lock()
+        self._submitted = deque()
+
+    def polled(self, events):
+        """ Timestamp the input events just taken from the queue """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        for event in events:
+            name = self.input_name(event)
+            if name:
+                self._polled.append(InputLatency(name, now))
+
+    def simulated(self, tick):
+        """ Mark the inputs polled so far as simulated up to the tick """
+        if not self._polled:
+            return
+        now = perf_counter()
+        for record in self._polled:
+            record.tick = tick
+            record.simulated = now
+        self._simulated += self._polled
+        self._polled = []
+
+    def submitted(self):
+        """ Number the next frame handed to the renderer and return the number """
+        self.frames += 1
+        if self._simulated:
+            for record in self._simulated:
+                record.frame = self.frames
+            with self._lock:
+                self._submitted.append((self.frames, self._simulated))
+            self._simulated = []
+        return self.frames
+
+    def presented(self, frame):
+        """ Mark the inputs of all frames up to the flipped frame as shown """
+        now = perf_counter()
+        with self._lock:
+            while self._submitted and self._submitted[0][0] <= frame:
+                for record in self._submitted.popleft()[1]:
+                    record.shown = now
+                    self.records.append(record)
+
+    @staticmethod
+    def input_name(event):
+        """ Return the name latencies of the event are grouped by, None to skip it """
+        if event.type == pygame.KEYDOWN:
+            return pygame.key.name(event.key) + ' down'
+        if event.type == pygame.KEYUP:
+            return pygame.key.name(event.key) + ' up'
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            return 'click'
+        return None
+
+    def summary(self):
+        """ Return the latency percentiles in ms and histogram of every input """
+        totals = {}
+        for record in list(self.records):
+            totals.setdefault(record.name, []).append(record.stages())
+
+        summary = {}
+        for name, stages in sorted(totals.items()):
+            total = sorted(stage[2] for stage in stages)
+            histogram = [0] * (len(BUCKETS) + 1)
+            for ms in total:
+                histogram[next((i for i, edge in enumerate(BUCKETS) if ms < edge), len(BUCKETS))] += 1
+            summary[name] = {
+                'count': len(total),
+                'to_tick_ms': statistics.median(stage[0] for stage in stages),
+                'to_display_ms': statistics.median(stage[1] for stage in stages),
+                'p50_ms': total[round((len(total) - 1) * 0.5)],
+                'p95_ms': total[round((len(total) - 1) * 0.95)],
+                'max_ms': total[-1],
+                'histogram': histogram,
+            }
+        return summary
+
+    def report(self):
+        """ Return the summary as lines of text with a histogram per input """
+        labels = ['<{}'.format(edge) for edge in BUCKETS] + ['>={}'.format(BUCKETS[-1])]
+        lines = []
+        for name, entry in self.summary().items():
+            lines.append('{:<14} {count:>6} inputs  p50 {p50_ms:6.2f} ms  p95 {p95_ms:6.2f} ms  '
+                         'max {max_ms:6.2f} ms  (to tick {to_tick_ms:.2f} ms, to display {to_display_ms:.2f} ms)'
+                         .format(name, **entry))
+            most = max(entry['histogram'])
+            for label, count in zip(labels, entry['histogram']):
+                if count:
+                    lines.append('    {:>6} ms {:>6} {}'.format(label, count, '#' * max(1, count * 40 // most)))
+        return lines
+
+    def dump(self, path):
+        """ Write every measured input with its stage times in ms as CSV """
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['input', 'tick', 'frame', 'to_tick_ms', 'to_display_ms', 'total_ms'])
+            for record in list(self.records):
+                writer.writerow([record.name, record.tick, record.frame] +
+                                ['{:.3f}'.format(ms) for ms in record.stages()])
@@ -0,0 +1,140 @@
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+# File header: magic, format version, number of entries
+HEADER = struct.Struct('<4sBB')
+MAGIC = b'AILB'
+VERSION = 1
+# The most entries the header can count
+MAX_SIZE = 255
+
+# One entry: score, level, unix time the game ended
+ENTRY = struct.Struct('<QHI')
+
+
+class Leaderboard:
+    """ The best scores, kept on disk by a background thread
+
+    Loading and saving never happen on the thread running the game. Files
+    are written to a temporary name and renamed over the old file, so a
+    crash in the middle of a save leaves the previous leaderboard intact.
+    """
+
+    def __init__(self, path, size, legacy_path=None):
+        """ Start loading the leaderboard in the background """
+        if not 0 < size <= MAX_SIZE:
+            raise ValueError('a leaderboard holds 1 to {} entries, not {}'.format(MAX_SIZE, size))
+        self.path = path
+        self.size = size
+        self.legacy_path = legacy_path
+
+        self.entries = []
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._reported = False
+
+        self._jobs = queue.Queue()
+        self._thread = None
+        if path:
+            self._thread = threading.Thread(target=self._work, name='leaderboard', daemon=True)
+            self._thread.start()
+            self._jobs.put(self._load)
+        else:
+            self._loaded.set()
+
+    @property
+    def high_score(self):
+        """ The best score loaded so far """
+        with self._lock:
+            return self.entries[0][0] if self.entries else 0
+
+    def poll(self):
+        """ Return True once after loading has finished """
+        if self._reported or not self._loaded.is_set():
+            return False
+        self._reported = True
+        return True
+
+    def add(self, score, level):
+        """ Add the result of a game and save the leaderboard in the background """
+        with self._lock:
+            self.entries.append((score, level, int(time.time())))
+            self.entries.sort(key=lambda entry: entry[0], reverse=True)
+            del self.entries[self.size:]
+        if self._thread:
+            self._jobs.put(self._save)
+
+    def close(self, timeout=2.0):
+        """ Wait a little for pending saves to finish """
+        if self._thread and self._thread.is_alive():
+            self._jobs.put(None)
+            self._thread.join(timeout)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                job()
+            except Exception:
+                # The thread has to live on for the jobs still to come
+                log.exception('leaderboard job failed')
+            finally:
+                self._jobs.task_done()
+
+    def _load(self):
+        try:
+            entries = self._read()
+        except (OSError, ValueError, struct.error):
+            entries = []
+        with self._lock:
+            # Scores added while loading are kept
+            self.entries = sorted(self.entries + entries, key=lambda entry: entry[0], reverse=True)[:self.size]
+        self._loaded.set()
+
+    def _read(self):
+        """ Return the entries in the file, or the score of the old format """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return self._read_legacy()
+
+        magic, version, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a leaderboard file')
+        return [ENTRY.unpack_from(data, HEADER.size + i * ENTRY.size) for i in range(count)]
+
+    def _read_legacy(self):
+        """ Return the single high score of a plain text high score file """
+        if not self.legacy_path:
+            return []
+        try:
+            with open(self.legacy_path) as f:
+                return [(int(f.readline()), 0, 0)]
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _save(self):
+        with self._lock:
+            entries = list(self.entries)
+        data = HEADER.pack(MAGIC, VERSION, len(entries)) + b''.join(ENTRY.pack(*entry) for entry in entries)
+
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            # The entries stay in memory and go out with the next save
+            log.warning('could not save the leaderboard to %s: %s', self.path, error)
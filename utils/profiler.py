@@ -0,0 +1,168 @@
+import csv
+import json
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+import pygame
+
+from utils.fonts import get_font
+
+
+class FrameProfiler:
+    """ Time the phases of every frame of the main loop
+
+    Sections with the same name in one frame add up, so a phase that runs
+    once per simulation tick reports its total for the frame. The last
+    window frames are kept for percentiles and up to max_samples frames
+    are kept for dumping to CSV or JSON.
+    """
+
+    def __init__(self, settings):
+        """ Initialize the profiler, disabled unless the settings enable it """
+        self.settings = settings
+        self.enabled = settings.profiling
+        self.reset()
+
+    def reset(self):
+        """ Forget all timings and start a new frame """
+        self.phases = []
+        self.history = {}
+        self.samples = deque(maxlen=self.settings.profiler_max_samples)
+        self._frame = {}
+        self._frame_start = perf_counter()
+
+    def toggle(self):
+        """ Switch profiling on or off """
+        self.enabled = not self.enabled
+        self._frame = {}
+        self._frame_start = perf_counter()
+
+    def section(self, name):
+        """ Return a context manager timing the enclosed block as the phase name """
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._frame[name] = self._frame.get(name, 0.0) + perf_counter() - start
+
+    def end_frame(self):
+        """ Store the timings of the finished frame """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self._frame['frame'] = now - self._frame_start
+        self._frame_start = now
+
+        for name in self._frame:
+            if name not in self.history:
+                self.phases.append(name)
+                self.history[name] = deque(maxlen=self.settings.profiler_window)
+        for name in self.phases:
+            self.history[name].append(self._frame.get(name, 0.0))
+
+        self.samples.append(self._frame)
+        self._frame = {}
+
+    def percentiles(self, name, percents=(50, 95, 99)):
+        """ Return the phase times in ms at the percents of the recent window """
+        values = sorted(self.history.get(name, ()))
+        if not values:
+            return [0.0 for _ in percents]
+        last = len(values) - 1
+        return [values[round(last * percent / 100)] * 1000 for percent in percents]
+
+    def dump(self, path):
+        """ Write the recorded per-frame timings in ms as CSV or JSON """
+        rows = [{name: frame.get(name, 0.0) * 1000 for name in self.phases} for frame in self.samples]
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.phases)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'w') as f:
+                json.dump(rows, f)
+
+
+class StartupTimer:
+    """ Record how long each phase of starting the game takes """
+
+    def __init__(self):
+        """ Start the clock """
+        self.start = perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """ Time the enclosed block as a phase of the startup """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, perf_counter() - start))
+
+    def mark(self, name):
+        """ Record the time since the start as a milestone """
+        self.phases.append((name, perf_counter() - self.start))
+
+    def report(self):
+        """ Return the phases as lines of text with times in ms """
+        return ['{:<20} {:8.2f} ms'.format(name, seconds * 1000) for name, seconds in self.phases]
+
+
+class PerformanceOverlay:
+    """ Show the rolling phase percentiles of the profiler on the screen """
+
+    def __init__(self, ai_game, profiler):
+        """ Initialize the overlay below the scoreboard """
+        self.screen = ai_game.screen
+        self.sb = ai_game.sb
+        self.profiler = profiler
+
+        self.text_color = (255, 255, 255)
+        self.bg_color = (0, 0, 0)
+        self.font = get_font(None, 24)
+
+        # Re-rendering text every frame would show up in the numbers itself
+        self.refresh_interval = 30
+        self._frames = 0
+        self.image = None
+
+    def prep_overlay(self):
+        """ Render a row per phase with its p50/p95/p99 times in ms """
+        rows = [('phase', 'p50', 'p95', 'p99')]
+        for name in self.profiler.phases:
+            rows.append([name] + ['{:.2f}'.format(ms) for ms in self.profiler.percentiles(name)])
+
+        # Render every cell on its own so the columns line up
+        cells = [[self.font.render(text, True, self.text_color) for text in row] for row in rows]
+        column_widths = [max(row[column].get_width() for row in cells) + 10 for column in range(4)]
+        line_height = self.font.get_linesize()
+
+        self.image = pygame.Surface((sum(column_widths), line_height * len(cells)))
+        self.image.fill(self.bg_color)
+        for row_number, row in enumerate(cells):
+            x = 0
+            for column, cell in enumerate(row):
+                # Numbers are right aligned, phase names left aligned
+                cell_x = x if column == 0 else x + column_widths[column] - cell.get_width() - 10
+                self.image.blit(cell, (cell_x, row_number * line_height))
+                x += column_widths[column]
+
+        self.rect = self.image.get_rect()
+        self.rect.right = self.sb.level_rect.right
+        self.rect.top = self.sb.level_rect.bottom + 10
+
+    def draw(self):
+        """ Draw the overlay and return its rect """
+        if self._frames % self.refresh_interval == 0:
+            self.prep_overlay()
+        self._frames += 1
+        return self.screen.blit(self.image, self.rect)
@@ -0,0 +1,80 @@
+import logging
+from collections import deque, namedtuple
+
+
+log = logging.getLogger(__name__)
+
+# What a quality tier keeps of the optional work: the share of stars drawn,
+# the share of explosion particles, every how many frames the score is
+# re-rendered, and whether text is anti-aliased
+QualityTier = namedtuple('QualityTier', 'name star_share particle_share score_interval antialias')
+
+
+class QualityGovernor:
+    """ Trade optional detail for frame time on slow machines
+
+    The work time of the last frames is compared to the frame budget. When
+    the frames run over budget the governor steps down a tier, and when
+    they leave plenty of headroom for a while it steps back up. Every change
+    is logged and kept in history.
+    """
+
+    TIERS = (
+        QualityTier('high', 1.0, 1.0, 1, True),
+        QualityTier('medium', 0.5, 0.5, 2, True),
+        QualityTier('low', 0.25, 0.25, 4, False),
+        QualityTier('minimal', 0.0, 0.0, 8, False),
+    )
+
+    # Step down when frames take longer than the budget on average, step up
+    # when they take less than this share of it
+    RESTORE_SHARE = 0.6
+
+    def __init__(self, settings, on_change=None):
+        """ Initialize the governor at the highest tier """
+        self.enabled = settings.adaptive_quality
+        self.budget = 1.0 / settings.quality_target_fps
+        self.window = settings.quality_window
+        self.on_change = on_change
+
+        self.tier = 0
+        self.history = []  # (frame number, old tier name, new tier name, average frame time)
+        self.frames = 0
+        self._times = deque(maxlen=self.window)
+        # Stepping up waits longer than stepping down, so a tier that only
+        # just fits is not left and re-entered over and over
+        self._restore_wait = 0
+
+    @property
+    def quality(self):
+        """ The current quality tier """
+        return self.TIERS[self.tier]
+
+    def update(self, frame_time):
+        """ Record the work time of a frame and change tiers if needed """
+        self.frames += 1
+        if not self.enabled:
+            return
+        self._times.append(frame_time)
+        if self._restore_wait:
+            self._restore_wait -= 1
+        if len(self._times) < self.window:
+            return
+
+        average = sum(self._times) / len(self._times)
+        if average > self.budget and self.tier < len(self.TIERS) - 1:
+            self._set_tier(self.tier + 1, average)
+            self._restore_wait = self.window * 5
+        elif average < self.budget * self.RESTORE_SHARE and self.tier > 0 and not self._restore_wait:
+            self._set_tier(self.tier - 1, average)
+
+    def _set_tier(self, tier, average):
+        old = self.quality
+        self.tier = tier
+        self.history.append((self.frames, old.name, self.quality.name, average))
+        log.info('quality %s -> %s at %.2f ms per frame', old.name, self.quality.name, average * 1000)
+
+        # The next decision is made on frames of the new tier only
+        self._times.clear()
+        if self.on_change:
+            self.on_change(self.quality)
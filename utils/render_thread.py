@@ -0,0 +1,196 @@
+import threading
+from collections import namedtuple
+from time import perf_counter
+
+import pygame
+
+
+# Kinds of recorded drawing commands
+BLIT, BLITS, FILL, ADD = range(4)
+
+# A recorded frame: its number, the new background or None, the screen
+# areas whose static content changed, and the drawing commands in order
+Frame = namedtuple('Frame', 'number background changed_rects commands')
+
+
+class DrawList:
+    """ A stand-in for the screen that records drawing instead of doing it
+
+    Blits and fills return the rects the screen would return, so the game
+    draws into it exactly as into the screen.
+    """
+
+    def __init__(self, screen):
+        """ Record drawing meant for the screen """
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.commands = []
+
+    def get_rect(self):
+        return self.screen.get_rect()
+
+    def get_size(self):
+        return self.screen.get_size()
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """ Record a blit and return the area of the screen it covers """
+        if area is not None:
+            area = pygame.Rect(area)
+        rect = pygame.Rect(dest[0], dest[1], *(area.size if area else source.get_size()))
+        self.commands.append((BLIT, source, rect.topleft, area, special_flags))
+        return rect.clip(self.screen_rect)
+
+    def blits(self, blit_sequence, doreturn=1):
+        """ Record a batch of blits and return their rects if doreturn is set """
+        blit_sequence = tuple(blit_sequence)
+        self.commands.append((BLITS, blit_sequence))
+        if doreturn:
+            return [self._blit_rect(*item) for item in blit_sequence]
+        return None
+
+    def fill(self, color, rect=None, special_flags=0):
+        """ Record a fill and return the area of the screen it covers """
+        # Clipped here, as some pygame versions fill rects reaching over the
+        # top edge shifted down instead of cut off
+        rect = pygame.Rect(rect).clip(self.screen_rect) if rect is not None else self.screen_rect.copy()
+        self.commands.append((FILL, color, rect, special_flags))
+        return rect.copy()
+
+    def _blit_rect(self, source, dest, area=None, special_flags=0):
+        """ Return the area of the screen a blit covers """
+        size = pygame.Rect(area).size if area is not None else source.get_size()
+        return pygame.Rect(dest[0], dest[1], *size).clip(self.screen_rect)
+
+    def take(self):
+        """ Return the commands recorded so far and start over """
+        commands, self.commands = tuple(self.commands), []
+        return commands
+
+
+class ThreadedRenderer:
+    """ Draw and show frames on a thread of their own
+
+    The game thread records each frame into a DrawList and hands it over as
+    an immutable Frame. The render thread draws the newest frame with the
+    wrapped renderer, so a slow flip no longer holds up the simulation.
+    Frames the render thread could not keep up with are merged into the
+    next one and skipped.
+
+    Surfaces handed over must not change afterwards. The fleet image is
+    the one surface the game changes in place, it is copied on write in
+    threaded mode, see Formation.
+    """
+
+    def __init__(self, renderer, canvas):
+        """ Start the render thread drawing with the renderer """
+        self.renderer = renderer
+        self.canvas = canvas
+
+        # Parts of the frame being recorded
+        self._background = None
+        self._changed_rects = ()
+
+        # The newest frame waiting to be drawn, handed over under the condition
+        self._condition = threading.Condition()
+        self._pending = None
+        self._running = True
+        self.error = None
+
+        # Called on the render thread with the number of every frame shown,
+        # frames are numbered from 1 in the order they are handed over
+        self.on_present = None
+        self.frames_submitted = 0
+
+        # Statistics of the render thread
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+        self.draw_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='render', daemon=True)
+        self._thread.start()
+
+    def set_background(self, background):
+        """ Replace the background from the next frame on """
+        self._background = background
+
+    def begin_frame(self, changed_rects=()):
+        """ Start recording a frame """
+        self._changed_rects = tuple(changed_rects)
+        self.canvas.take()
+
+    def add(self, rect):
+        """ Register a rect drawn in this frame """
+        if rect:
+            self.canvas.commands.append((ADD, rect))
+
+    def end_frame(self):
+        """ Hand the recorded frame over to the render thread """
+        if self.error is not None:
+            raise self.error
+        self.frames_submitted += 1
+        frame = Frame(self.frames_submitted, self._background, self._changed_rects, self.canvas.take())
+        self._background = None
+
+        with self._condition:
+            pending = self._pending
+            if pending is not None:
+                # What the skipped frame changed still has to reach the screen
+                self.frames_skipped += 1
+                background = frame.background if frame.background is not None else pending.background
+                frame = Frame(frame.number, background, pending.changed_rects + frame.changed_rects,
+                              frame.commands)
+            self._pending = frame
+            self._condition.notify()
+
+    def to_screen(self, pos):
+        """ Convert a position on the display to a position on the screen """
+        return self.renderer.to_screen(pos)
+
+    def close(self):
+        """ Draw the last frame handed over and stop the render thread """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+        self.renderer.close()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                frame, self._pending = self._pending, None
+
+            start = perf_counter()
+            try:
+                self._draw(frame)
+            except Exception as error:
+                # Raised on the game thread when it hands over the next frame
+                self.error = error
+                return
+            self.draw_time += perf_counter() - start
+            self.frames_drawn += 1
+            if self.on_present:
+                self.on_present(frame.number)
+
+    def _draw(self, frame):
+        """ Replay a recorded frame on the screen and show it """
+        renderer = self.renderer
+        screen = renderer.screen
+        if frame.background is not None:
+            renderer.set_background(frame.background)
+
+        renderer.begin_frame(frame.changed_rects)
+        for command in frame.commands:
+            kind = command[0]
+            if kind == BLIT:
+                screen.blit(*command[1:])
+            elif kind == BLITS:
+                screen.blits(command[1], doreturn=False)
+            elif kind == FILL:
+                screen.fill(*command[1:])
+            else:
+                renderer.add(command[1])
+        renderer.end_frame()
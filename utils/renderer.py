@@ -0,0 +1,136 @@
+import pygame
+
+
+class Renderer:
+    """ Redraw the whole screen every frame over a pre-baked background """
+
+    def __init__(self, screen, background, display=None):
+        """ Initialize the renderer with the surface to restore each frame
+
+        With a display given, the screen is an offscreen surface that is
+        scaled onto the display whenever a frame is shown. It keeps its
+        aspect ratio and is centered, with borders where it does not fill
+        the display.
+        """
+        self.screen = screen
+        self.background = background
+        self.display = display
+        self.border_color = (0, 0, 0)
+        # Display and size the fitted area below was worked out for
+        self._fitted = None
+
+        # Called with the number of every frame shown, counted from 1
+        self.on_present = None
+        self.frames_presented = 0
+
+    def set_background(self, background):
+        """ Replace the background, e.g. after the sky has changed """
+        self.background = background
+
+    def begin_frame(self, changed_rects=()):
+        """ Clear the screen to the background """
+        self.screen.blit(self.background, (0, 0))
+
+    def add(self, rect):
+        """ Register a rect drawn in this frame """
+
+    def end_frame(self):
+        """ Show the frame on the display """
+        self._present()
+
+    def close(self):
+        """ Release the renderer """
+
+    def to_screen(self, pos):
+        """ Convert a position on the display to a position on the screen """
+        if self.display is None:
+            return pos
+        area = self._fit()[0]
+        screen_width, screen_height = self.screen.get_size()
+        return ((pos[0] - area.x) * screen_width // area.width,
+                (pos[1] - area.y) * screen_height // area.height)
+
+    def _fit(self):
+        """ Return the area of the display the screen is scaled to, its subsurface and the borders """
+        key = (self.display, self.display.get_size())
+        if self._fitted is None or self._fitted[0] != key:
+            screen_width, screen_height = self.screen.get_size()
+            display_rect = self.display.get_rect()
+            scale = min(display_rect.width / screen_width, display_rect.height / screen_height)
+            area = pygame.Rect(0, 0, max(1, round(screen_width * scale)), max(1, round(screen_height * scale)))
+            area.center = display_rect.center
+            # Bars on the left and right or above and below the scaled screen
+            borders = [rect for rect in (
+                pygame.Rect(0, 0, area.left, display_rect.height),
+                pygame.Rect(area.right, 0, display_rect.right - area.right, display_rect.height),
+                pygame.Rect(0, 0, display_rect.width, area.top),
+                pygame.Rect(0, area.bottom, display_rect.width, display_rect.bottom - area.bottom),
+            ) if rect.width and rect.height]
+            self._fitted = (key, (area, self.display.subsurface(area), borders))
+        return self._fitted[1]
+
+    def _present(self, rects=None):
+        """ Push the rects of the screen to the display, all of it if None """
+        if self.display is not None:
+            # A scaled frame changes everywhere, so it is always pushed whole
+            area, target, borders = self._fit()
+            for rect in borders:
+                self.display.fill(self.border_color, rect)
+            pygame.transform.scale(self.screen, area.size, target)
+            pygame.display.flip()
+        elif rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+        self.frames_presented += 1
+        if self.on_present:
+            self.on_present(self.frames_presented)
+
+
+class DirtyRenderer(Renderer):
+    """ Redraw and push only the parts of the screen that have changed
+
+    Everything drawn in a frame is registered with add(). At the start of
+    the next frame those rects are restored from the background, and only
+    the old and new rects are sent to the display.
+    """
+
+    def __init__(self, screen, background, display=None):
+        """ Initialize the renderer, the first frame is pushed in full """
+        super().__init__(screen, background, display)
+        self._previous = []
+        self._restored = []
+        self._current = []
+        self._full_update = True
+
+    def set_background(self, background):
+        """ Replace the background and redraw the whole screen once """
+        super().set_background(background)
+        self._full_update = True
+
+    def begin_frame(self, changed_rects=()):
+        """ Restore the background under everything drawn last frame """
+        if self._full_update:
+            self.screen.blit(self.background, (0, 0))
+            self._restored = []
+        else:
+            # Static things that have changed are restored and pushed as well
+            self._restored = self._previous + list(changed_rects)
+            for rect in self._restored:
+                self.screen.blit(self.background, rect, rect)
+        self._current = []
+
+    def add(self, rect):
+        """ Register a rect drawn in this frame """
+        if rect:
+            self._current.append(rect)
+
+    def end_frame(self):
+        """ Push the changed parts of the screen to the display """
+        if self._full_update:
+            self._present()
+            self._full_update = False
+        else:
+            self._present(self._restored + self._current)
+        self._previous = self._current
@@ -0,0 +1,141 @@
+import struct
+
+import pygame
+
+
+# File header: magic, format version, RNG seed, tick rate, screen width and
+# height, and the settings that change the rules: stress mode, bullets
+# allowed and pixel collisions
+HEADER = struct.Struct('<4sBIHHH?H?')
+MAGIC = b'AIRL'
+VERSION = 2
+
+# One record per event: tick, kind, key, mouse x and y
+RECORD = struct.Struct('<IBiHH')
+END, KEYDOWN, KEYUP, MOUSEBUTTONDOWN, QUIT = range(5)
+
+# Event types the game responds to and their kinds in the log
+EVENT_KINDS = {
+    pygame.KEYDOWN: KEYDOWN,
+    pygame.KEYUP: KEYUP,
+    pygame.MOUSEBUTTONDOWN: MOUSEBUTTONDOWN,
+    pygame.QUIT: QUIT,
+}
+KIND_EVENTS = {kind: event_type for event_type, kind in EVENT_KINDS.items()}
+
+
+class LiveInput:
+    """ Read input events from the pygame event queue """
+
+    finished = False
+
+    def get(self, tick):
+        return pygame.event.get()
+
+    def close(self):
+        pass
+
+
+class InputRecorder:
+    """ Pass events through from another input and log them with their tick """
+
+    finished = False
+
+    def __init__(self, source, path, settings, to_screen=None):
+        """ Open the log and write the settings a replay needs to match
+
+        Mouse positions are logged on the screen the game is drawn on,
+        to_screen converts them when that is scaled to the display.
+        """
+        self.source = source
+        self.to_screen = to_screen
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, settings.seed, settings.tick_rate,
+                                    settings.screen_width, settings.screen_height, settings.stress_mode,
+                                    settings.bullets_allowed, settings.pixel_collisions))
+        self.tick = 0
+
+    def get(self, tick):
+        """ Return the events of the source after writing them to the log """
+        self.tick = tick
+        events = self.source.get(tick)
+        for event in events:
+            kind = EVENT_KINDS.get(event.type)
+            if kind is None:
+                continue
+            key = getattr(event, 'key', 0)
+            x, y = getattr(event, 'pos', (0, 0))
+            if self.to_screen and kind == MOUSEBUTTONDOWN:
+                x, y = self.to_screen((x, y))
+            self.file.write(RECORD.pack(tick, kind, key, x, y))
+        return events
+
+    def close(self):
+        """ Mark the tick the session ended on and close the log """
+        if not self.file.closed:
+            self.file.write(RECORD.pack(self.tick, END, 0, 0, 0))
+            self.file.close()
+        self.source.close()
+
+
+class InputPlayer:
+    """ Play back the events of an input log at the ticks they happened """
+
+    def __init__(self, path):
+        """ Read the whole log """
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, version = HEADER.unpack_from(data)[:2]
+        if magic != MAGIC:
+            raise ValueError("'{}' is not an Alien Invasion input log".format(path))
+        if version != VERSION:
+            raise ValueError("'{}' is an input log of version {}, not {}".format(path, version, VERSION))
+        (_, _, self.seed, self.tick_rate, self.screen_width, self.screen_height,
+         self.stress_mode, self.bullets_allowed, self.pixel_collisions) = HEADER.unpack_from(data)
+
+        self.records = list(RECORD.iter_unpack(data[HEADER.size:]))
+        self.end_tick = self.records[-1][0] if self.records else 0
+        self._next = 0
+
+    def configure(self, settings):
+        """ Make the settings match the recorded session """
+        settings.tick_rate = self.tick_rate
+        settings.screen_width = self.screen_width
+        settings.screen_height = self.screen_height
+        settings.stress_mode = self.stress_mode
+        settings.bullets_allowed = self.bullets_allowed
+        settings.pixel_collisions = self.pixel_collisions
+        # The screen is recorded at the size the game was drawn at
+        settings.render_size = None
+        settings.fullscreen = False
+        settings.lockstep = True
+        # A replay must not load or overwrite the quick-save of real play
+        settings.quicksave_path = None
+
+    @property
+    def finished(self):
+        return self._next >= len(self.records)
+
+    def get(self, tick):
+        """ Return the recorded events up to the tick """
+        # Keep the window responsive, live events are ignored
+        pygame.event.pump()
+
+        events = []
+        while not self.finished and self.records[self._next][0] <= tick:
+            _, kind, key, x, y = self.records[self._next]
+            self._next += 1
+            if kind == END:
+                continue
+            event_type = KIND_EVENTS[kind]
+            if event_type == pygame.MOUSEBUTTONDOWN:
+                events.append(pygame.event.Event(event_type, pos=(x, y), button=1))
+            elif event_type == pygame.QUIT:
+                events.append(pygame.event.Event(event_type))
+            else:
+                events.append(pygame.event.Event(event_type, key=key, mod=0, unicode=''))
+        return events
+
+    def close(self):
+        pass
@@ -1,12 +1,14 @@
-import pygame
-import pygame.font
-
-from game.ship import Ship
+from game import assets
+from utils.fonts import get_font
+from utils.glyph_atlas import GlyphAtlas
+from utils.leaderboard import Leaderboard
 
 
 class ScoreBoard:
     """ A class to report scoring information """
 
+    LABELS = ('Score: ', 'High: ', 'Level: ')
+
     def __init__(self, ai_game):
         """ Initialize scorekeeping attributes """
         self.ai_game = ai_game
@@ -17,10 +19,22 @@ class ScoreBoard:
 
         # Font setting for scoring information
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = get_font(None, 48)
+        # Score text is put together from pre-rendered glyphs
+        self.atlas = GlyphAtlas(self.font, self.text_color, labels=self.LABELS)
+
+        # The score and high score are re-rendered at most every score_interval frames
+        self.score_interval = 1
+        self._score_pending = False
+        self._high_score_pending = False
+        self._frames = 0
+
+        # Screen areas whose content changed since they were last taken
+        self.changed_rects = []
 
-        # Read existing high-score from the file
-        self._read_high_score()
+        # The best scores load in the background and show up once read
+        self.leaderboard = Leaderboard(self.settings.leaderboard_path, self.settings.leaderboard_size,
+                                       legacy_path='highscore.data')
 
         self.prep_images()
 
@@ -28,7 +42,9 @@ class ScoreBoard:
         """ Check to see if there is a new high score """
         if self.stats.high_score < self.stats.score:
             self.stats.high_score = self.stats.score
-            self.prep_high_score()
+            self._high_score_pending = True
+            if self.score_interval == 1:
+                self.prep_high_score()
 
     def prep_images(self):
         """ Prepare the initial score images """
@@ -37,63 +53,112 @@ class ScoreBoard:
         self.prep_level()
         self.prep_ships()
 
+    def score_changed(self):
+        """ Show the new score now, or with the next re-render at a lower quality """
+        self._score_pending = True
+        if self.score_interval == 1:
+            self.prep_score()
+
+    def set_quality(self, score_interval, antialias):
+        """ Re-render the scores less often and text without anti-aliasing to save time """
+        self.score_interval = score_interval
+        if antialias != self.atlas.antialias:
+            self.atlas = GlyphAtlas(self.font, self.text_color, labels=self.LABELS, antialias=antialias)
+            self.prep_score()
+            self.prep_high_score()
+            self.prep_level()
+
+    def update(self):
+        """ Catch up on the score and high score once per frame """
+        self._frames += 1
+        if self._frames % self.score_interval == 0:
+            if self._score_pending:
+                self.prep_score()
+            if self._high_score_pending:
+                self.prep_high_score()
+        self.check_leaderboard()
+
     def prep_score(self):
         """ Turn the score into a rendered image """
+        self._score_pending = False
         rounded_score = round(self.stats.score, -1)  # Round value to the nearest 10
-        score_str = 'Score: {:,}'.format(rounded_score)  # Format numerical value to a string with inserted sep
-        self.score_image = self.font.render(score_str, True, self.text_color)  # back: self.settings.bg_color
+        score_str = '{:,}'.format(rounded_score)  # Format numerical value to a string with inserted sep
+        self.score_image = self.atlas.render('Score: ', score_str)
 
         # Display the score at the top right of the screen
+        self._mark_changed('score_rect')
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - 20
         self.score_rect.top = 20
+        self._mark_changed('score_rect')
 
     def prep_high_score(self):
         """ Turn the high score into the rendered image """
+        self._high_score_pending = False
         rounded_high_score = round(self.stats.high_score, -1)
-        high_score_str = 'High: {:,}'.format(rounded_high_score)
-        self.high_score_image = self.font.render(high_score_str, True, self.text_color)  # back: self.settings.bg_color
+        high_score_str = '{:,}'.format(rounded_high_score)
+        self.high_score_image = self.atlas.render('High: ', high_score_str)
 
         # Center high score at the top of the screen
+        self._mark_changed('high_score_rect')
         self.high_score_rect = self.high_score_image.get_rect()
         self.high_score_rect.centerx = self.screen_rect.centerx
         self.high_score_rect.top = self.score_rect.top
+        self._mark_changed('high_score_rect')
 
     def prep_level(self):
         """ Turn the level into the rendered image """
-        level_str = 'Level: ' + str(self.stats.level)
-        self.level_image = self.font.render(level_str, True, self.text_color)  # back: self.settings.bg_color
+        level_str = str(self.stats.level)
+        self.level_image = self.atlas.render('Level: ', level_str)
 
+        self._mark_changed('level_rect')
         self.level_rect = self.level_image.get_rect()
         self.level_rect.right = self.score_rect.right
         self.level_rect.top = self.score_rect.bottom + 10
+        self._mark_changed('level_rect')
 
     def prep_ships(self):
         """ Show how many ships are left """
-        self.ships = pygame.sprite.Group()
+        # All the icons share one cached image, only their rects differ
+        self.ship_image = assets.get_image('ship')
+        self.changed_rects.extend(getattr(self, 'ship_rects', []))
+        self.ship_rects = []
         for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)
+            rect = self.ship_image.get_rect()
+            rect.x = 10 + ship_number * rect.width
+            rect.y = 10
+            self.ship_rects.append(rect)
+        self.changed_rects.extend(self.ship_rects)
 
     def show_score(self):
-        """ Draw scores, level and ships to the screen """
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+        """ Draw scores, level and ships to the screen and return the drawn rects """
+        rects = [
+            self.screen.blit(self.score_image, self.score_rect),
+            self.screen.blit(self.high_score_image, self.high_score_rect),
+            self.screen.blit(self.level_image, self.level_rect),
+        ]
+        for rect in self.ship_rects:
+            rects.append(self.screen.blit(self.ship_image, rect))
+        return rects
+
+    def take_changed_rects(self):
+        """ Return the screen areas that changed since the last call """
+        changed_rects, self.changed_rects = self.changed_rects, []
+        return changed_rects
+
+    def _mark_changed(self, rect_name):
+        """ Remember the current area of an image as changed """
+        rect = getattr(self, rect_name, None)
+        if rect is not None:
+            self.changed_rects.append(rect.copy())
 
     def store_high_score(self):
-        """ Store high-score value in the file """
-        if self.stats.high_score > 0:
-            with open('highscore.data', 'w') as f:
-                f.write(str(self.stats.high_score))
-
-    def _read_high_score(self):
-        """ Read the current high-score from the file """
-        try:
-            with open('highscore.data') as f:
-                self.stats.high_score = int(f.readline())
-        except FileNotFoundError:
-            pass
+        """ Add the score of the finished game to the leaderboard """
+        if self.stats.score > 0:
+            self.leaderboard.add(self.stats.score, self.stats.level)
+
+    def check_leaderboard(self):
+        """ Show the high score from the leaderboard once it has loaded """
+        if self.leaderboard.poll() and self.leaderboard.high_score > self.stats.high_score:
+            self.stats.high_score = self.leaderboard.high_score
+            self.prep_high_score()
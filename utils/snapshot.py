@@ -0,0 +1,167 @@
+import logging
+import struct
+from collections import deque
+
+import numpy as np
+
+from utils.game_state import GameState
+
+
+log = logging.getLogger(__name__)
+
+# Snapshot header: magic, format version, screen width and height
+HEADER = struct.Struct('<4sBHH')
+MAGIC = b'AISS'
+VERSION = 2
+
+# Statistics, dynamic settings, game state, ship and tick count:
+# score, high score, level, ships left, game active,
+# ship/bullet/alien speed, alien points, fleet direction, manual level, stress level,
+# state, state timer, state callback, ship x and previous x, moving right and left, tick
+GAME = struct.Struct('<QQHB? dddQbHH BdB dd?? I')
+
+# Bullets: number of bullets, then their x (int32), y and previous y (float64)
+BULLETS = struct.Struct('<I')
+
+# Fleets: number of fleets, then per fleet its offsets, direction and number
+# of aliens followed by one bit per alien that is still alive
+FLEETS = struct.Struct('<B')
+FLEET = struct.Struct('<ddibI')
+
+STATES = (GameState.PLAYING, GameState.RESPAWNING, GameState.LEVEL_TRANSITION, GameState.GAME_OVER)
+# Methods of AlienInvasion a state may call when its timer runs out
+CALLBACKS = (None, 'start_new_level', 'respawn')
+
+
+def take_snapshot(ai_game):
+    """ Return the state of the game as bytes
+
+    Explosion particles are left out, they do not change the game.
+    """
+    settings, stats, state, ship = ai_game.settings, ai_game.stats, ai_game.state, ai_game.ship
+    callback = getattr(state.on_expire, '__name__', None)
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, settings.screen_width, settings.screen_height),
+        GAME.pack(stats.score, stats.high_score, stats.level, stats.ships_left, stats.game_active,
+                  settings.ship_speed, settings.bullet_speed, settings.alien_speed, settings.alien_points,
+                  settings.fleet_direction, settings.manual_level, settings.stress_level,
+                  STATES.index(state.state), state.timer, CALLBACKS.index(callback),
+                  ship.x, ship.prev_x, ship.moving_right, ship.moving_left, ai_game.loop.tick_count),
+    ]
+
+    x, y, prev_y = ai_game.bullets.get_state()
+    parts += [BULLETS.pack(len(x)), x.astype('<i4').tobytes(), y.astype('<f8').tobytes(),
+              prev_y.astype('<f8').tobytes()]
+
+    parts.append(FLEETS.pack(len(ai_game.fleets)))
+    for fleet in ai_game.fleets:
+        offset_x, prev_offset_x, offset_y, direction, alive = fleet.get_state()
+        parts += [FLEET.pack(offset_x, prev_offset_x, offset_y, direction, len(alive)),
+                  np.packbits(alive).tobytes()]
+    return b''.join(parts)
+
+
+def restore_snapshot(ai_game, data):
+    """ Put the game back into the state of a snapshot
+
+    The whole snapshot is read and checked before anything is changed, so a
+    broken one raises ValueError or struct.error and leaves the game as it was.
+    """
+    settings, stats, state, ship = ai_game.settings, ai_game.stats, ai_game.state, ai_game.ship
+    magic, version, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not an Alien Invasion snapshot')
+    if (width, height) != (settings.screen_width, settings.screen_height):
+        raise ValueError('snapshot of a {}x{} screen'.format(width, height))
+    offset = HEADER.size
+
+    game = GAME.unpack_from(data, offset)
+    offset += GAME.size
+    # Fields checked before the game is changed
+    state_index, callback_index = game[12], game[14]
+    if state_index >= len(STATES) or callback_index >= len(CALLBACKS):
+        raise ValueError('snapshot of an unknown game state')
+
+    count, = BULLETS.unpack_from(data, offset)
+    offset += BULLETS.size
+    x = np.frombuffer(data, '<i4', count, offset)
+    y = np.frombuffer(data, '<f8', count, offset + 4 * count)
+    prev_y = np.frombuffer(data, '<f8', count, offset + 12 * count)
+    offset += 20 * count
+
+    fleet_count, = FLEETS.unpack_from(data, offset)
+    offset += FLEETS.size
+    fleets = []
+    for _ in range(fleet_count):
+        offset_x, prev_offset_x, offset_y, direction, aliens = FLEET.unpack_from(data, offset)
+        offset += FLEET.size
+        size = (aliens + 7) // 8
+        alive = np.unpackbits(np.frombuffer(data, np.uint8, size, offset))[:aliens].astype(bool)
+        offset += size
+        fleets.append((offset_x, prev_offset_x, offset_y, direction, alive))
+
+    # The fleets have to fit the layout of the restored stress level
+    density, extra_rows, expected_fleets, _ = settings.stress_values(game[11])
+    aliens = len(ai_game.fleet_layout(density, extra_rows)[0])
+    if len(fleets) != expected_fleets or any(len(fleet[4]) != aliens for fleet in fleets):
+        raise ValueError('snapshot fleets do not fit the layout of its level')
+
+    (stats.score, stats.high_score, stats.level, stats.ships_left, stats.game_active,
+     settings.ship_speed, settings.bullet_speed, settings.alien_speed, settings.alien_points,
+     settings.fleet_direction, settings.manual_level, settings.stress_level,
+     _, timer, _,
+     ship.x, ship.prev_x, ship.moving_right, ship.moving_left, ai_game.loop.tick_count) = game
+    settings.apply_stress()
+
+    callback = CALLBACKS[callback_index]
+    state.set(STATES[state_index], timer, callback and getattr(ai_game, callback))
+    ship.rect.x = int(ship.x)
+    ai_game.bullets.set_state(x, y, prev_y)
+
+    # The fleets are rebuilt from the cached layouts of the restored level,
+    # then set to the restored positions and survivors
+    ai_game.create_fleet()
+    for fleet, fleet_state in zip(ai_game.fleets, fleets):
+        fleet.set_state(*fleet_state)
+
+    ai_game.particles.empty()
+    ai_game.sb.prep_images()
+
+
+class RewindBuffer:
+    """ Snapshots of the last seconds of play, taken every interval ticks """
+
+    def __init__(self, settings):
+        """ Initialize an empty buffer sized for the rewind settings """
+        self.interval = max(1, round(settings.rewind_interval * settings.tick_rate))
+        # (tick, snapshot) pairs, oldest first
+        self.snapshots = deque(maxlen=max(1, int(settings.rewind_seconds / settings.rewind_interval)))
+        self._failing = False
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def update(self, ai_game):
+        """ Take a snapshot if the tick just run is a multiple of the interval """
+        tick = ai_game.loop.tick_count
+        if tick % self.interval:
+            return
+        try:
+            self.snapshots.append((tick, take_snapshot(ai_game)))
+            self._failing = False
+        except (struct.error, ValueError) as error:
+            # E.g. a value outgrew its field, the game goes on without rewinding
+            if not self._failing:
+                log.warning('could not take a rewind snapshot: %s', error)
+            self._failing = True
+
+    def pop(self):
+        """ Return the newest snapshot and forget it, None if there is none """
+        if not self.snapshots:
+            return None
+        return self.snapshots.pop()[1]
+
+    def clear(self):
+        """ Forget all snapshots """
+        self.snapshots.clear()